@@ -6,23 +6,170 @@ import os
 import re # For parsing os-release
 from utils import get_os_release_info
 import errno # For checking mount errors
-import time   # For delays
 import shutil # For copying bootloader files
+import threading # For the streaming command watchdog
+import ctypes # For calling mount(2) directly
+import sys
+import signal # For stopping a command's whole process group
+import json # For talking to the root runner
+import ctypes.util
+
+# --- Persistent Root Runner --- 
+# Source of the helper started once under pkexec: reads one JSON request per line, runs it, answers with one JSON line.
+# Requests run on a worker thread so a {"cancel": true} line can terminate the command while it runs.
+_ROOT_RUNNER_SRC = r"""
+import json, os, signal, subprocess, sys, threading
+lock = threading.Lock()
+state = {"proc": None, "cancelled": False}
+def run(req):
+    try:
+        p = subprocess.Popen(req["cmd"], stdin=subprocess.DEVNULL if req.get("input") is None else subprocess.PIPE,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True)
+        with lock:
+            state["proc"] = p
+            if state["cancelled"]:
+                os.killpg(p.pid, signal.SIGTERM)
+        try:
+            out, err = p.communicate(req.get("input"), timeout=req.get("timeout"))
+            resp = {"rc": p.returncode, "stdout": out, "stderr": err}
+        except subprocess.TimeoutExpired:
+            os.killpg(p.pid, signal.SIGKILL)
+            out, err = p.communicate()
+            resp = {"error": "timeout", "stdout": out, "stderr": err}
+    except FileNotFoundError as e:
+        resp = {"error": "not_found", "stdout": "", "stderr": str(e)}
+    except Exception as e:
+        resp = {"error": "other", "stdout": "", "stderr": str(e)}
+    with lock:
+        state["proc"] = None
+    sys.stdout.write(json.dumps(resp) + "\n"); sys.stdout.flush()
+sys.stdout.write(json.dumps({"ready": True}) + "\n"); sys.stdout.flush()
+for line in sys.stdin:
+    req = json.loads(line)
+    with lock:
+        if req.get("cancel"):
+            state["cancelled"] = True
+            if state["proc"] is not None:
+                try:
+                    os.killpg(state["proc"].pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            continue
+        state["cancelled"] = False
+    threading.Thread(target=run, args=(req,)).start()
+"""
+_root_runner = None
+_root_runner_lock = threading.Lock() # One request in flight at a time on the shared pipes
+_root_runner_write_lock = threading.Lock() # Serializes writes to the runner's stdin (requests and cancels)
+
+def start_root_runner():
+    """Starts the persistent pkexec root runner (one authorization for all later _run_command calls).
+    No-op when already root or already running. Returns True if the runner is available.
+    """
+    global _root_runner
+    if os.geteuid() == 0:
+        return False
+    with _root_runner_lock:
+        if _root_runner is not None and _root_runner.poll() is None:
+            return True
+        try:
+            runner = subprocess.Popen(["pkexec", sys.executable, "-c", _ROOT_RUNNER_SRC],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=-1)
+            if json.loads(runner.stdout.readline() or "{}").get("ready"):
+                _root_runner = runner
+                print("Root runner started.")
+                return True
+            runner.kill()
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not start root runner, falling back to pkexec per command: {e}")
+        return False
+
+def stop_root_runner():
+    """Stops the root runner started by start_root_runner, if any."""
+    global _root_runner
+    with _root_runner_lock:
+        runner, _root_runner = _root_runner, None
+    if runner is not None:
+        try:
+            runner.stdin.close()
+            runner.wait(timeout=5)
+        except Exception:
+            runner.kill()
+
+def _root_runner_send(runner, message):
+    """Writes one JSON line to the root runner."""
+    with _root_runner_write_lock:
+        runner.stdin.write(json.dumps(message) + "\n")
+        runner.stdin.flush()
+
+def _root_runner_cancel(runner):
+    """Asks the root runner to terminate the command it is running."""
+    try:
+        _root_runner_send(runner, {"cancel": True})
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not send cancel to root runner: {e}")
 
-def _run_command(command_list, description, progress_callback=None, timeout=None, pipe_input=None):
+def _root_runner_call(command_list, timeout, pipe_input, cancellable=None):
+    """Runs a command through the root runner. Returns the response dict, or None if no runner is usable.
+    If a Gio.Cancellable is given, cancelling it makes the runner terminate the command.
+    """
+    global _root_runner
+    with _root_runner_lock:
+        if _root_runner is None:
+            return None
+        runner = _root_runner
+        cancel_handler = None
+        try:
+            _root_runner_send(runner, {"cmd": command_list, "timeout": timeout, "input": pipe_input})
+            if cancellable is not None:
+                cancel_handler = cancellable.connect("cancelled", lambda _c: _root_runner_cancel(runner))
+                if cancellable.is_cancelled(): # Cancelled before we connected
+                    _root_runner_cancel(runner)
+            return json.loads(runner.stdout.readline())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Root runner failed ({e}), falling back to pkexec per command.")
+            runner.kill()
+            _root_runner = None
+            return None
+        finally:
+            if cancel_handler is not None:
+                cancellable.disconnect(cancel_handler)
+
+def _signal_process_group(process, sig):
+    """Signals the process group of a command started with start_new_session=True.
+    
+    Signalling only the direct child would leave e.g. parted/mkfs under /bin/sh running with the
+    output pipes still open, so communicate() would keep waiting for them.
+    """
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass # Already exited
+    except PermissionError:
+        # A setuid-root pkexec child can't be signalled by the unprivileged installer
+        print(f"Warning: Not permitted to signal process group {process.pid}; the command runs to completion.")
+
+def _run_command(command_list, description, progress_callback=None, timeout=None, pipe_input=None, cancellable=None):
     """Runs a command, using pkexec if not already root, captures output, handles errors.
     
-    Checks os.geteuid() to determine if running as root.
+    Checks os.geteuid() to determine if running as root. When not root and the root runner
+    is up (start_root_runner), the command goes through it instead of a fresh pkexec.
+    If a Gio.Cancellable is given, cancelling it terminates the running command (directly spawned or in the runner).
     """
     
     is_root = os.geteuid() == 0
     final_command_list = []
     execution_method = ""
+    runner_response = None if is_root else _root_runner_call(command_list, timeout, pipe_input, cancellable)
 
     if is_root:
         final_command_list = command_list
         execution_method = "directly as root"
         print(f"Executing Backend Step ({execution_method}): {description} -> {' '.join(shlex.quote(c) for c in final_command_list)}")
+    elif runner_response is not None:
+        final_command_list = command_list
+        execution_method = "via root runner"
+        print(f"Executing Backend Step ({execution_method}): {description} -> {' '.join(shlex.quote(c) for c in final_command_list)}")
     else:
         # Prepend pkexec if not running as root
         final_command_list = ["pkexec"] + command_list
@@ -34,17 +181,41 @@ def _run_command(command_list, description, progress_callback=None, timeout=None
         
     stderr_output = ""
     stdout_output = ""
+    process = None
     try:
-        # Run the command (either directly or with pkexec)
-        process = subprocess.Popen(
-            final_command_list, # Use the decided command list
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE if pipe_input is not None else None,
-            text=True
-        )
-        
-        stdout_output, stderr_output = process.communicate(input=pipe_input, timeout=timeout)
+        if runner_response is not None:
+            # Already ran in the root runner; map its errors onto the exceptions handled below
+            stdout_output, stderr_output = runner_response.get("stdout", ""), runner_response.get("stderr", "")
+            error = runner_response.get("error")
+            if error == "timeout":
+                raise subprocess.TimeoutExpired(command_list, timeout, output=stdout_output)
+            if error == "not_found":
+                raise FileNotFoundError(stderr_output)
+            if error:
+                raise RuntimeError(stderr_output)
+            returncode = runner_response["rc"]
+        else:
+            # Run the command (either directly or with pkexec)
+            process = subprocess.Popen(
+                final_command_list, # Use the decided command list
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.PIPE if pipe_input is not None else None,
+                text=True,
+                start_new_session=True # Own process group: a stop or timeout also reaches what a script spawned
+            )
+            
+            cancel_handler = None
+            if cancellable is not None:
+                cancel_handler = cancellable.connect("cancelled", lambda _c: _signal_process_group(process, signal.SIGTERM))
+                if cancellable.is_cancelled(): # Cancelled before we connected
+                    _signal_process_group(process, signal.SIGTERM)
+            try:
+                stdout_output, stderr_output = process.communicate(input=pipe_input, timeout=timeout)
+            finally:
+                if cancel_handler is not None:
+                    cancellable.disconnect(cancel_handler)
+            returncode = process.returncode
         
         print(f"  Command {description} stdout:\n{stdout_output.strip()}")
         if stderr_output:
@@ -56,14 +227,14 @@ def _run_command(command_list, description, progress_callback=None, timeout=None
              if filtered_stderr.strip():
                  print(f"  Command {description} stderr:\n{filtered_stderr.strip()}")
 
-        if process.returncode != 0:
-            error_detail = stderr_output.strip() or f"Exited with code {process.returncode}"
+        if returncode != 0:
+            error_detail = stderr_output.strip() or f"Exited with code {returncode}"
             # Check for pkexec/PolicyKit errors only if running via pkexec
             error_msg = f"{description} failed ({execution_method}): {error_detail}"
             if execution_method == "via pkexec":
-                if "Authentication failed" in error_detail or process.returncode == 127:
+                if "Authentication failed" in error_detail or returncode == 127:
                      error_msg = f"Authorization failed for {description}. Check PolicyKit rules or password."
-                elif "Cannot run program" in error_detail or process.returncode == 126:
+                elif "Cannot run program" in error_detail or returncode == 126:
                      error_msg = f"Command not found or not permitted by PolicyKit for {description}: {command_list[0]}"
                 # else: use the generic error_msg already set
             
@@ -104,11 +275,18 @@ def _run_command(command_list, description, progress_callback=None, timeout=None
             err = "Command not found: pkexec. Cannot run privileged commands."
         print(f"ERROR: {err}")
         return False, err, None 
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         err = f"Timeout expired after {timeout}s for {description} ({execution_method})."
+        # Keep what the command printed before it hung (e.g. the storage script's step markers)
+        partial = e.stdout
+        if isinstance(partial, bytes):
+            partial = partial.decode("utf-8", "replace")
+        if partial:
+            stdout_output = partial
         try:
-            process.kill()
-            process.wait()
+            if process is not None:
+                _signal_process_group(process, signal.SIGKILL)
+                process.wait()
         except Exception as kill_e:
             print(f"Warning: Error trying to kill timed out process: {kill_e}")
         return False, err, stdout_output.strip() 
@@ -118,12 +296,94 @@ def _run_command(command_list, description, progress_callback=None, timeout=None
         print(f"ERROR: {err}")
         return False, err, stdout_output.strip()
 
-# --- New _run_in_chroot function ---
-def _run_in_chroot(target_root, command_list, description, progress_callback=None, timeout=None, pipe_input=None):
-    """Runs a command inside the target root using chroot, managing bind mounts.
+def _stream_command(command_list, timeout=None, line_callback=None, check=False):
+    """Runs a command directly, reading its merged stdout/stderr line by line as it is produced.
     
-    Requires manual mounting/unmounting of /proc, /sys, /dev, /dev/pts, and /etc/resolv.conf.
-    Assumes the caller (_run_command) handles root privileges.
+    Mirrors subprocess.run: returns a CompletedProcess (stderr folded into stdout) and raises
+    subprocess.TimeoutExpired / CalledProcessError (with check=True). A watchdog timer enforces
+    the timeout while output is still being read, which Popen.wait(timeout) alone cannot do.
+    Without a line_callback nothing needs to be seen early, so the output is read as bytes and
+    decoded once instead of through a per-read text decoder.
+    """
+    if line_callback is None:
+        with subprocess.Popen(command_list, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+            try:
+                raw, _ = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                raw, _ = process.communicate()
+                raise subprocess.TimeoutExpired(command_list, timeout, output=raw.decode("utf-8", "replace"))
+            returncode = process.returncode
+        output = raw.decode("utf-8", "replace")
+    else:
+        lines = []
+        timed_out = threading.Event()
+        with subprocess.Popen(command_list, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=-1) as process:
+            def on_timeout():
+                timed_out.set()
+                process.kill()
+            watchdog = threading.Timer(timeout, on_timeout) if timeout else None
+            if watchdog:
+                watchdog.daemon = True
+                watchdog.start()
+            try:
+                for line in process.stdout:
+                    lines.append(line)
+                    line_callback(line.rstrip())
+                returncode = process.wait()
+            finally:
+                if watchdog:
+                    watchdog.cancel()
+        output = "".join(lines)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command_list, timeout, output=output)
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command_list, output=output, stderr="")
+    return subprocess.CompletedProcess(command_list, returncode, stdout=output, stderr="")
+
+def _lsof_busy_check(paths, description, timeout=15):
+    """Checks whether any process holds one of paths (a path or a list of them) open, stopping lsof at the first process it reports.
+    
+    Same (success, error, stdout) shape as _run_command; stdout is non-empty only when a path is busy.
+    Uses machine-readable `lsof -F pn` with every path in one invocation; falls back to _run_command when not root.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    lsof_cmd = ["lsof", "-F", "pn", "--"] + list(paths)
+    if os.geteuid() != 0:
+        return _run_command(lsof_cmd, description, timeout=timeout)
+    print(f"Executing Backend Step (directly as root): {description} -> {' '.join(shlex.quote(c) for c in lsof_cmd)}")
+    holder = []
+    try:
+        with subprocess.Popen(lsof_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=-1) as process:
+            watchdog = threading.Timer(timeout, process.kill)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in process.stdout:
+                    # Fields: p<pid>, then f<fd>/n<name> per open file; the first pid plus one name is enough
+                    if line.startswith("p") or (holder and line.startswith("n")):
+                        holder.append(line.strip())
+                        if len(holder) == 2:
+                            break
+            finally:
+                watchdog.cancel()
+                if holder:
+                    process.terminate() # Skip the rest of lsof's scan
+    except FileNotFoundError:
+        return False, "Command not found: lsof. Ensure it's installed and in the PATH.", None
+    if holder:
+        name = holder[1][1:] if len(holder) > 1 else ", ".join(paths)
+        return True, "", f"PID {holder[0][1:]} has {name} open"
+    return True, "", ""
+
+# --- New _run_in_chroot function ---
+# Chroot API mounts kept across _run_in_chroot calls while a session is open: target_root -> [(target, name)]
+_chroot_sessions = {}
+
+def _mount_chroot_filesystems(target_root, mounted_paths):
+    """Mounts /proc, /sys, /dev, /dev/pts, the D-Bus socket, efivars and the /boot binds for a chroot into target_root.
+    Appends each (target, name) to mounted_paths as it goes, so the caller can unmount a partial setup; raises RuntimeError.
     """
     host_dbus_socket = "/run/dbus/system_bus_socket"
     target_dbus_socket = os.path.join(target_root, host_dbus_socket.lstrip('/'))
@@ -136,7 +396,6 @@ def _run_in_chroot(target_root, command_list, description, progress_callback=Non
         "resolv.conf": os.path.join(target_root, "etc/resolv.conf"),
         "dbus": target_dbus_socket # Add dbus socket target
     }
-    mounted_paths = []  # Changed to list to maintain order and store (target, name) tuples
     
     # Add efivars path if host supports EFI
     host_efi_vars_path = "/sys/firmware/efi/efivars"
@@ -151,187 +410,231 @@ def _run_in_chroot(target_root, command_list, description, progress_callback=Non
     # Add /boot/efi path if it exists and is mounted
     target_boot_efi_path = os.path.join(target_root, "boot/efi")
     if os.path.exists(target_boot_efi_path):
-        # Check if it's mounted by looking for any mount activity
-        try:
-            # Use findmnt to check if this is a mount point
-            findmnt_cmd = ["findmnt", target_boot_efi_path]
-            findmnt_result = subprocess.run(findmnt_cmd, capture_output=True, text=True, check=False, timeout=5)
-            if findmnt_result.returncode == 0:
-                mount_points["boot_efi"] = target_boot_efi_path
-                print(f"  Will bind-mount /boot/efi into chroot: {target_boot_efi_path}")
-            else:
-                print(f"  /boot/efi exists but is not mounted: {target_boot_efi_path}")
-        except Exception as e:
-            print(f"  Warning: Could not check /boot/efi mount status: {e}")
-            # If we can't check, but the directory exists, try to include it anyway
-            if os.path.exists(target_boot_efi_path):
-                mount_points["boot_efi"] = target_boot_efi_path
-                print(f"  Including /boot/efi in chroot anyway: {target_boot_efi_path}")
+        # Check if it's mounted, from the kernel mount table (no findmnt spawn)
+        if any(tgt == target_boot_efi_path for _src, tgt in _list_mounts()):
+            mount_points["boot_efi"] = target_boot_efi_path
+            print(f"  Will bind-mount /boot/efi into chroot: {target_boot_efi_path}")
+        else:
+            print(f"  /boot/efi exists but is not mounted: {target_boot_efi_path}")
     else:
         print(f"  /boot/efi directory does not exist: {target_boot_efi_path}")
     
-    try:
-        # --- Mount API filesystems, resolv.conf, and D-Bus socket --- 
-        print(f"Setting up chroot environment in {target_root}...")
-        
-        # Prepare target directories/files first
-        resolv_conf_target = mount_points["resolv.conf"]
-        resolv_conf_dir = os.path.dirname(resolv_conf_target)
-        
-        # Ensure target /etc directory exists (still needed for potential D-Bus dir below)
-        if not os.path.exists(resolv_conf_dir):
-             try:
-                 print(f"  Creating directory {resolv_conf_dir}...")
-                 os.makedirs(resolv_conf_dir, exist_ok=True)
-             except OSError as e:
-                 raise RuntimeError(f"Failed to create target directory {resolv_conf_dir}: {e}") from e
-                 
-        # Ensure target /etc/resolv.conf file exists for bind mount
-        # --- Block MODIFIED TO DO NOTHING --- 
-        if not os.path.exists(resolv_conf_target):
-            # Try block is now empty
-            try:
-                pass # Do nothing, file should be copied by progress.py
-            except OSError as e:
-                 # This should now be unreachable
-                 raise RuntimeError(f"Failed to create target file {resolv_conf_target}: {e}") from e
-        # --- End Block MODIFIED --- 
-                 
-        if os.path.exists(host_dbus_socket):
-             dbus_target_dir = os.path.dirname(mount_points["dbus"])
-             try:
-                 os.makedirs(dbus_target_dir, exist_ok=True)
-                 # Create an empty file for the socket bind mount target?
-                 # Or maybe just mount the socket file directly? Mount requires dir for source/target usually?
-                 # Let's try mounting the socket file directly using --bind.
-             except OSError as e:
-                 raise RuntimeError(f"Failed to prepare target D-Bus directory {dbus_target_dir}: {e}") from e
-        else:
-             print(f"Warning: Host D-Bus socket {host_dbus_socket} not found. Services inside chroot might fail.")
-
-        # Refactored structure: (name, source, target, fstype, options_list)
-        mount_commands = [
-            ("proc",    "proc",                mount_points["proc"],        "proc",    ["nodev","noexec","nosuid"]), 
-            ("sysfs",   "sys",                 mount_points["sys"],         "sysfs",   ["nodev","noexec","nosuid"]), 
-            ("devtmpfs","udev",               mount_points["dev"],         "devtmpfs",["mode=0755","nosuid"]), 
-            ("devpts",  "devpts",              mount_points["dev/pts"],     "devpts",  ["mode=0620","gid=5","nosuid","noexec"]), 
-            ("bind",    host_dbus_socket,      mount_points["dbus"],        None,      ["--bind"]),
-            # Conditionally add efivars mount
-            ("efivars", "efivarfs",            mount_points.get("efivars"), "efivarfs",["nosuid","noexec","nodev"]), # Source is the fstype
-            ("boot",    target_boot_path,      mount_points.get("boot"),      None,      ["--bind"]),
-            ("boot_efi", target_boot_efi_path, mount_points.get("boot_efi"),  None,      ["--bind"])
-        ]
+    # --- Mount API filesystems, resolv.conf, and D-Bus socket --- 
+    print(f"Setting up chroot environment in {target_root}...")
+    
+    # Prepare target directories/files first
+    resolv_conf_target = mount_points["resolv.conf"]
+    resolv_conf_dir = os.path.dirname(resolv_conf_target)
+    
+    # Ensure target /etc directory exists (still needed for potential D-Bus dir below)
+    if not os.path.exists(resolv_conf_dir):
+         try:
+             print(f"  Creating directory {resolv_conf_dir}...")
+             os.makedirs(resolv_conf_dir, exist_ok=True)
+         except OSError as e:
+             raise RuntimeError(f"Failed to create target directory {resolv_conf_dir}: {e}") from e
+             
+    # Ensure target /etc/resolv.conf file exists for bind mount
+    # --- Block MODIFIED TO DO NOTHING --- 
+    if not os.path.exists(resolv_conf_target):
+        # Try block is now empty
+        try:
+            pass # Do nothing, file should be copied by progress.py
+        except OSError as e:
+             # This should now be unreachable
+             raise RuntimeError(f"Failed to create target file {resolv_conf_target}: {e}") from e
+    # --- End Block MODIFIED --- 
+             
+    if os.path.exists(host_dbus_socket):
+         dbus_target_dir = os.path.dirname(mount_points["dbus"])
+         try:
+             os.makedirs(dbus_target_dir, exist_ok=True)
+             # Create an empty file for the socket bind mount target?
+             # Or maybe just mount the socket file directly? Mount requires dir for source/target usually?
+             # Let's try mounting the socket file directly using --bind.
+         except OSError as e:
+             raise RuntimeError(f"Failed to prepare target D-Bus directory {dbus_target_dir}: {e}") from e
+    else:
+         print(f"Warning: Host D-Bus socket {host_dbus_socket} not found. Services inside chroot might fail.")
+
+    # Refactored structure: (name, source, target, fstype, options_list)
+    mount_commands = [
+        ("proc",    "proc",                mount_points["proc"],        "proc",    ["nodev","noexec","nosuid"]), 
+        ("sysfs",   "sys",                 mount_points["sys"],         "sysfs",   ["nodev","noexec","nosuid"]), 
+        ("devtmpfs","udev",               mount_points["dev"],         "devtmpfs",["mode=0755","nosuid"]), 
+        ("devpts",  "devpts",              mount_points["dev/pts"],     "devpts",  ["mode=0620","gid=5","nosuid","noexec"]), 
+        ("bind",    host_dbus_socket,      mount_points["dbus"],        None,      ["--bind"]),
+        # Conditionally add efivars mount
+        ("efivars", "efivarfs",            mount_points.get("efivars"), "efivarfs",["nosuid","noexec","nodev"]), # Source is the fstype
+        ("boot",    target_boot_path,      mount_points.get("boot"),      None,      ["--bind"]),
+        ("boot_efi", target_boot_efi_path, mount_points.get("boot_efi"),  None,      ["--bind"])
+    ]
 
-        for name, source, target, fstype, options_list in mount_commands:
-            # Skip D-Bus mount if source doesn't exist
-            if name == "bind" and source == host_dbus_socket and not os.path.exists(host_dbus_socket):
-                 print(f"  Skipping D-Bus socket mount (source {host_dbus_socket} not found).")
-                 continue
-                 
-            # Skip efivars mount if target wasn't added (host doesn't have it)
-            if name == "efivars" and not target:
-                 print(f"  Skipping efivars mount (host path {host_efi_vars_path} not found).")
-                 continue
-                 
-            # Skip boot mount if target wasn't added
-            if name == "boot" and not target:
-                 print(f"  Skipping boot mount (directory {target_boot_path} not found).")
+    for name, source, target, fstype, options_list in mount_commands:
+        # Skip D-Bus mount if source doesn't exist
+        if name == "bind" and source == host_dbus_socket and not os.path.exists(host_dbus_socket):
+             print(f"  Skipping D-Bus socket mount (source {host_dbus_socket} not found).")
+             continue
+             
+        # Skip efivars mount if target wasn't added (host doesn't have it)
+        if name == "efivars" and not target:
+             print(f"  Skipping efivars mount (host path {host_efi_vars_path} not found).")
+             continue
+             
+        # Skip boot mount if target wasn't added
+        if name == "boot" and not target:
+             print(f"  Skipping boot mount (directory {target_boot_path} not found).")
+             continue
+             
+        # Skip boot_efi mount if target wasn't added (not mounted)
+        if name == "boot_efi" and not target:
+             print(f"  Skipping boot_efi mount (EFI partition not mounted or directory not found).")
+             continue
+             
+        try:
+            # Ensure target dir exists for non-file bind mounts
+            if name != "bind" or source == "/etc/resolv.conf": # resolv.conf needs dir
+                 os.makedirs(target, exist_ok=True)
+            # For the dbus socket bind mount
+            elif name == "bind" and source == host_dbus_socket:
+                 os.makedirs(os.path.dirname(target), exist_ok=True)
+                 # Create empty file as mount target if it doesn't exist? Bind mount needs a target.
+                 if not os.path.exists(target):
+                     open(target, 'a').close() 
+                      
+            # mount(2) directly; mount(8) below only if the syscall fails (e.g. EBUSY, already mounted)
+            if "--bind" in options_list:
+                mount_flags, mount_data = MS_BIND, None
+            else:
+                mount_flags = sum(_MOUNT_OPTION_FLAGS.get(o, 0) for o in options_list)
+                mount_data = ",".join(o for o in options_list if o not in _MOUNT_OPTION_FLAGS) or None
+            direct_ok, direct_err = _mount_direct(source, target, fstype or "", mount_flags, mount_data)
+            if direct_ok:
+                print(f"  Mounted {source} -> {target} ({name}) with mount(2)")
+                mounted_paths.append((target, name))
+                continue
+            print(f"  Warning: {direct_err}. Falling back to mount(8)...")
+
+            # Construct mount command correctly
+            mount_cmd = ["mount"]
+            
+            # --- Special Handling for resolv.conf bind mount ---
+            # If target file exists, remove it first, as mount --bind might require it.
+            # if name == "bind" and source == "/etc/resolv.conf":
+            #     if os.path.exists(target):
+            #         print(f"  Target file {target} exists. Removing before bind mount.")
+            #         try:
+            #             os.remove(target)
+            #         except OSError as rm_e:
+            #             print(f"  Warning: Failed to remove existing {target}: {rm_e}")
+            #             # Continue anyway, maybe mount will still work or overwrite?
+            # --------------------------------------------------
+            
+            if fstype:
+                mount_cmd.extend(["-t", fstype])
+            
+            # Handle options - differentiate between --bind and -o list
+            if "--bind" in options_list:
+                mount_cmd.append("--bind")
+            elif options_list: # Only add -o if there are other options
+                mount_cmd.extend(["-o", ",".join(options_list)])
+                
+            mount_cmd.extend([source, target])
+            
+            print(f"  Mounting {source} -> {target} ({name}) with command: {' '.join(shlex.quote(c) for c in mount_cmd)}")
+            result = subprocess.run(mount_cmd, check=True, capture_output=True, text=True, timeout=15)
+            mounted_paths.append((target, name))
+        except FileNotFoundError:
+             raise RuntimeError("Mount command failed: 'mount' executable not found.")
+        except subprocess.CalledProcessError as e:
+            # Check if already mounted (exit code 32 often means this)
+            if e.returncode == 32 and ("already mounted" in e.stderr or "mount point does not exist" in e.stderr or "Not a directory" in e.stderr): # Added check for dbus socket
+                print(f"    Warning: Mount for {target} possibly already exists or target invalid? {e.stderr.strip()}")
+                mounted_paths.append((target, name)) 
+            else:
+                raise RuntimeError(f"Failed to mount {source} to {target}: {e.stderr.strip()}") from e
+        except Exception as e:
+             raise RuntimeError(f"Unexpected error mounting {source}: {e}") from e
+
+def _unmount_chroot_filesystems(mounted_paths):
+    """Unmounts what _mount_chroot_filesystems mounted, in reverse order (the /boot/efi bind is kept)."""
+    # --- Unmount in reverse order ---
+    try:
+        print("Cleaning up chroot environment...")
+        for mount_info in reversed(mounted_paths):
+             mount_target, mount_name = mount_info
+             
+             # Skip unmounting /boot/efi if we're in the middle of installation
+             # It should remain mounted for bootloader installation
+             if mount_name == "boot_efi":
+                 print(f"  Preserving EFI mount for bootloader installation: {mount_target}")
                  continue
-                 
-            # Skip boot_efi mount if target wasn't added (not mounted)
-            if name == "boot_efi" and not target:
-                 print(f"  Skipping boot_efi mount (EFI partition not mounted or directory not found).")
+             
+             print(f"  Unmounting {mount_target}...")
+             # umount2(2) directly, umount(8) below only if the syscall fails
+             direct_ok, direct_err = _umount_direct(mount_target)
+             if direct_ok:
+                 print(f"    Successfully unmounted {mount_target}")
                  continue
-                 
-            try:
-                # Ensure target dir exists for non-file bind mounts
-                if name != "bind" or source == "/etc/resolv.conf": # resolv.conf needs dir
-                     os.makedirs(target, exist_ok=True)
-                # For the dbus socket bind mount
-                elif name == "bind" and source == host_dbus_socket:
-                     os.makedirs(os.path.dirname(target), exist_ok=True)
-                     # Create empty file as mount target if it doesn't exist? Bind mount needs a target.
-                     if not os.path.exists(target):
-                         open(target, 'a').close() 
-                          
-                # Construct mount command correctly
-                mount_cmd = ["mount"]
-                
-                # --- Special Handling for resolv.conf bind mount ---
-                # If target file exists, remove it first, as mount --bind might require it.
-                # if name == "bind" and source == "/etc/resolv.conf":
-                #     if os.path.exists(target):
-                #         print(f"  Target file {target} exists. Removing before bind mount.")
-                #         try:
-                #             os.remove(target)
-                #         except OSError as rm_e:
-                #             print(f"  Warning: Failed to remove existing {target}: {rm_e}")
-                #             # Continue anyway, maybe mount will still work or overwrite?
-                # --------------------------------------------------
-                
-                if fstype:
-                    mount_cmd.extend(["-t", fstype])
-                
-                # Handle options - differentiate between --bind and -o list
-                if "--bind" in options_list:
-                    mount_cmd.append("--bind")
-                elif options_list: # Only add -o if there are other options
-                    mount_cmd.extend(["-o", ",".join(options_list)])
-                    
-                mount_cmd.extend([source, target])
-                
-                print(f"  Mounting {source} -> {target} ({name}) with command: {' '.join(shlex.quote(c) for c in mount_cmd)}")
-                result = subprocess.run(mount_cmd, check=True, capture_output=True, text=True, timeout=15)
-                mounted_paths.append((target, name))
-            except FileNotFoundError:
-                 raise RuntimeError("Mount command failed: 'mount' executable not found.")
-            except subprocess.CalledProcessError as e:
-                # Check if already mounted (exit code 32 often means this)
-                if e.returncode == 32 and ("already mounted" in e.stderr or "mount point does not exist" in e.stderr or "Not a directory" in e.stderr): # Added check for dbus socket
-                    print(f"    Warning: Mount for {target} possibly already exists or target invalid? {e.stderr.strip()}")
-                    mounted_paths.append((target, name)) 
-                else:
-                    raise RuntimeError(f"Failed to mount {source} to {target}: {e.stderr.strip()}") from e
-            except Exception as e:
-                 raise RuntimeError(f"Unexpected error mounting {source}: {e}") from e
+             print(f"    Warning: {direct_err}. Falling back to umount(8)...")
+             try:
+                 umount_cmd = ["umount", mount_target]
+                 result = subprocess.run(umount_cmd, capture_output=True, text=True, check=True, timeout=30)
+                 print(f"    Successfully unmounted {mount_target}")
+             except subprocess.CalledProcessError as e:
+                 print(f"    Warning: Failed to unmount {mount_target}: {e.stderr.strip()}")
+                 # Try lazy unmount as fallback
+                 try:
+                     lazy_umount_cmd = ["umount", "-l", mount_target]
+                     subprocess.run(lazy_umount_cmd, capture_output=True, text=True, check=True, timeout=15)
+                     print(f"    Lazy unmount successful for {mount_target}")
+                 except Exception as lazy_e:
+                     print(f"    Warning: Lazy unmount also failed for {mount_target}: {lazy_e}")
+             except Exception as e:
+                 print(f"    Warning: Error unmounting {mount_target}: {e}")
+    except Exception as e:
+        print(f"Warning: Error during chroot cleanup: {e}")
 
+def open_chroot_session(target_root):
+    """Mounts the chroot API filesystems once; _run_in_chroot reuses them until close_chroot_session.
+    Returns (success, error_message); on failure _run_in_chroot keeps setting up and tearing down per call.
+    """
+    if target_root in _chroot_sessions:
+        return True, ""
+    mounted_paths = []
+    try:
+        _mount_chroot_filesystems(target_root, mounted_paths)
+    except Exception as e:
+        _unmount_chroot_filesystems(mounted_paths)
+        return False, f"Failed to set up chroot session in {target_root}: {e}"
+    _chroot_sessions[target_root] = mounted_paths
+    return True, ""
+
+def close_chroot_session(target_root):
+    """Unmounts the API filesystems of an open chroot session (no-op if none is open)."""
+    mounted_paths = _chroot_sessions.pop(target_root, None)
+    if mounted_paths is not None:
+        _unmount_chroot_filesystems(mounted_paths)
+
+def _run_in_chroot(target_root, command_list, description, progress_callback=None, timeout=None, pipe_input=None):
+    """Runs a command inside the target root using chroot, managing bind mounts.
+    
+    Requires manual mounting/unmounting of /proc, /sys, /dev, /dev/pts, and /etc/resolv.conf.
+    Assumes the caller (_run_command) handles root privileges.
+    Within an open_chroot_session the mounts are already in place and are left alone.
+    """
+    chroot_cmd = ["chroot", target_root] + command_list
+    if target_root in _chroot_sessions:
+        return _run_command(chroot_cmd, description, progress_callback, timeout, pipe_input)
+    mounted_paths = []
+    try:
+        _mount_chroot_filesystems(target_root, mounted_paths)
         # --- Execute command in chroot --- 
-        chroot_cmd = ["chroot", target_root] + command_list
         # Use _run_command to handle execution (it checks root/pkexec itself)
         success, err, stdout = _run_command(chroot_cmd, description, progress_callback, timeout, pipe_input)
         return success, err, stdout
-        
     finally:
-        # --- Unmount in reverse order ---
-        try:
-            print("Cleaning up chroot environment...")
-            for mount_info in reversed(mounted_paths):
-                 mount_target, mount_name = mount_info
-                 
-                 # Skip unmounting /boot/efi if we're in the middle of installation
-                 # It should remain mounted for bootloader installation
-                 if mount_name == "boot_efi":
-                     print(f"  Preserving EFI mount for bootloader installation: {mount_target}")
-                     continue
-                 
-                 try:
-                     print(f"  Unmounting {mount_target}...")
-                     umount_cmd = ["umount", mount_target]
-                     result = subprocess.run(umount_cmd, capture_output=True, text=True, check=True, timeout=30)
-                     print(f"    Successfully unmounted {mount_target}")
-                 except subprocess.CalledProcessError as e:
-                     print(f"    Warning: Failed to unmount {mount_target}: {e.stderr.strip()}")
-                     # Try lazy unmount as fallback
-                     try:
-                         lazy_umount_cmd = ["umount", "-l", mount_target]
-                         subprocess.run(lazy_umount_cmd, capture_output=True, text=True, check=True, timeout=15)
-                         print(f"    Lazy unmount successful for {mount_target}")
-                     except Exception as lazy_e:
-                         print(f"    Warning: Lazy unmount also failed for {mount_target}: {lazy_e}")
-                 except Exception as e:
-                     print(f"    Warning: Error unmounting {mount_target}: {e}")
-        except Exception as e:
-            print(f"Warning: Error during chroot cleanup: {e}")
+        _unmount_chroot_filesystems(mounted_paths)
 
 # --- Configuration Functions ---
 
@@ -997,17 +1300,13 @@ def install_bootloader_in_container(target_root, primary_disk, efi_partition_dev
             # Try to auto-detect EFI partition from mounted filesystems
             efi_mount_point = os.path.join(target_root, "boot/efi")
             if os.path.ismount(efi_mount_point):
-                # Find the device that mounted this partition
-                try:
-                    result = subprocess.run(
-                        ["findmnt", "-n", "-o", "SOURCE", "--target", efi_mount_point],
-                        capture_output=True, text=True, check=False, timeout=10
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        efi_partition_device = result.stdout.strip()
-                        print(f"Auto-detected EFI partition: {efi_partition_device}")
-                except Exception as e:
-                    print(f"Could not auto-detect EFI partition: {e}")
+                # Find the device that mounted this partition (last entry = topmost mount)
+                efi_sources = [src for src, tgt in _list_mounts() if tgt == efi_mount_point]
+                if efi_sources:
+                    efi_partition_device = efi_sources[-1]
+                    print(f"Auto-detected EFI partition: {efi_partition_device}")
+                else:
+                    print(f"Could not auto-detect EFI partition: {efi_mount_point} not in mount table")
             
             if not efi_partition_device:
                 return False, "UEFI system detected but EFI partition path not provided and could not be auto-detected.", None
@@ -1913,6 +2212,116 @@ def cleanup_efi_mount(target_root):
     else:
         print(f"EFI partition not mounted, no cleanup needed: {efi_mount_point}")
 
+# --- Mount Table Helper --- 
+_MOUNTINFO_ESCAPE_RE = re.compile(r"\\([0-7]{3})") # mountinfo escapes space/tab/newline/backslash as \ooo
+
+def _unescape_mountinfo(value):
+    return _MOUNTINFO_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), value)
+
+def _list_mounts():
+    """Returns [(source, target), ...] for the current mount namespace, read from /proc/self/mountinfo.
+    Cheaper than findmnt: no subprocess and no libblkid probing. Returns [] if the file can't be read.
+    """
+    mounts = []
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                # Optional fields make the pre-separator part variable length; source follows " - fstype"
+                head, sep, tail = line.rstrip("\n").partition(" - ")
+                fields, post = head.split(" "), tail.split(" ")
+                if not sep or len(fields) < 5 or len(post) < 2:
+                    continue
+                mounts.append((_unescape_mountinfo(post[1]), _unescape_mountinfo(fields[4])))
+    except OSError as e:
+        print(f"Warning: Failed to read /proc/self/mountinfo: {e}")
+    return mounts
+
+def _list_disk_device_paths(disk_device):
+    """Returns the /dev paths of disk_device, its partitions and every device stacked on them.
+    Read from /sys/block instead of running lsblk; returns [disk_device] if sysfs can't be read.
+    """
+    base = os.path.basename(os.path.realpath(disk_device))
+    sys_dir = f"/sys/block/{base}"
+    paths = [disk_device]
+    visited = set() # Holders shared by several partitions (e.g. an LV spanning two PVs) are listed once
+
+    def add_holders(dev_dir):
+        # Holders (LVM LVs, dm-crypt, md) are listed by lsblk too; mount tables show dm devices as /dev/mapper/<name>
+        # Recursive: LVM on LUKS or an LV on md stacks holders of holders
+        for holder in sorted(os.listdir(f"{dev_dir}/holders")):
+            if holder in visited:
+                continue
+            visited.add(holder)
+            try:
+                with open(f"/sys/block/{holder}/dm/name") as f:
+                    paths.append(f"/dev/mapper/{f.read().strip()}")
+            except OSError:
+                paths.append(f"/dev/{holder}")
+            add_holders(f"/sys/block/{holder}")
+
+    try:
+        # Partition directories carry a "partition" file; names follow the kernel's (sda1, nvme0n1p1, mmcblk0p1)
+        parts = sorted(name for name in os.listdir(sys_dir) if os.path.isfile(f"{sys_dir}/{name}/partition"))
+        for name in [None] + parts:
+            dev_dir = sys_dir if name is None else f"{sys_dir}/{name}"
+            if name is not None:
+                paths.append(f"/dev/{name}")
+            add_holders(dev_dir)
+    except OSError as e:
+        print(f"Warning: Failed to read {sys_dir}: {e}")
+    return paths
+
+# --- Direct mount(2)/umount2(2) Helpers --- 
+MS_NOSUID = 2
+MS_NODEV = 4
+MS_NOEXEC = 8
+MS_BIND = 4096
+MS_RELATIME = 1 << 21
+# mount(8) -o keywords that are mount(2) flags; the remaining options go into the data string
+_MOUNT_OPTION_FLAGS = {"nosuid": MS_NOSUID, "nodev": MS_NODEV, "noexec": MS_NOEXEC, "relatime": MS_RELATIME}
+MNT_FORCE = 1
+MNT_DETACH = 2
+_libc = None
+
+def _get_libc():
+    """Loads libc once for the direct mount helpers (raises OSError/AttributeError if unavailable)."""
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.mount.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_ulong, ctypes.c_char_p]
+        libc.umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+def _mount_direct(source, target, fstype, flags=0, data=None):
+    """Mounts source on target with the mount(2) syscall, skipping mount(8)'s fork/exec and blkid probe.
+    Returns (success, error_message); callers fall back to mount(8) on failure.
+    """
+    try:
+        ret = _get_libc().mount(os.fsencode(source), os.fsencode(target), fstype.encode(), flags, data.encode() if data else None)
+    except (OSError, AttributeError) as e:
+        return False, f"mount(2) unavailable: {e}"
+    if ret != 0:
+        err = ctypes.get_errno()
+        return False, f"mount(2) of {source} on {target} failed: {os.strerror(err)} ({errno.errorcode.get(err, err)})"
+    return True, ""
+
+def _umount_direct(target, flags=0, missing_ok=False):
+    """Unmounts target with the umount2(2) syscall (flags: MNT_FORCE/MNT_DETACH), no umount(8) fork/exec.
+    Returns (success, error_message); callers fall back to umount(8) on failure.
+    With missing_ok, EINVAL (target is not a mount point) counts as success, so no ismount() pre-check is needed.
+    """
+    try:
+        ret = _get_libc().umount2(os.fsencode(target), flags)
+    except (OSError, AttributeError) as e:
+        return False, f"umount2(2) unavailable: {e}"
+    if ret != 0:
+        err = ctypes.get_errno()
+        if missing_ok and err == errno.EINVAL:
+            return True, ""
+        return False, f"umount2(2) of {target} failed: {os.strerror(err)} ({errno.errorcode.get(err, err)})"
+    return True, ""
+
 # --- Service Management Helpers --- 
 def _manage_service(action, service_name):
     """Helper to start or stop a systemd service."""
@@ -1936,6 +2345,16 @@ def _start_service(service_name):
     print(f"Attempting to start service: {service_name}...")
     return _manage_service("start", service_name)
 
+# --- udev Helper --- 
+def _udev_settle(timeout=30):
+    """Waits for the udev event queue to drain (returns at once when it is empty). Failures are only logged."""
+    try:
+        subprocess.run(["udevadm", "settle", f"--timeout={timeout}"], check=False, timeout=timeout + 2)
+    except FileNotFoundError:
+        print("Warning: udevadm not found, cannot settle udev queue.")
+    except Exception as e:
+        print(f"Warning: udevadm settle failed: {e}")
+
 # --- LVM Deactivation Helper --- 
 def _deactivate_lvm_on_disk(disk_device, progress_callback=None):
     """Attempts to find and deactivate LVM VGs associated with a disk and its partitions."""
@@ -1948,20 +2367,10 @@ def _deactivate_lvm_on_disk(disk_device, progress_callback=None):
     all_success = True
     errors = []
 
-    # 1. Find partitions of the main disk
-    try:
-        lsblk_cmd = ["lsblk", "-n", "-o", "PATH", "--raw", disk_device]
-        print(f"  Running: {' '.join(shlex.quote(c) for c in lsblk_cmd)}")
-        lsblk_result = subprocess.run(lsblk_cmd, capture_output=True, text=True, check=False, timeout=10)
-        if lsblk_result.returncode == 0:
-            found_paths = [line.strip() for line in lsblk_result.stdout.split('\n') if line.strip() and line.strip() != disk_device]
-            print(f"  Found potential partition paths via lsblk: {found_paths}")
-            devices_to_check.update(found_paths)
-        else:
-            print(f"  Warning: lsblk failed for {disk_device} (rc={lsblk_result.returncode}), checking only base device for PVs.")
-    except Exception as e:
-        print(f"  Warning: Error running lsblk to find partitions for {disk_device}: {e}")
-        # Continue with just the base disk_device
+    # 1. Find partitions of the main disk (sysfs, no lsblk fork/exec; falls back to just the base disk_device)
+    found_paths = [path for path in _list_disk_device_paths(disk_device) if path != disk_device]
+    print(f"  Found potential partition paths via sysfs: {found_paths}")
+    devices_to_check.update(found_paths)
 
     # 2. Find VGs associated with each device (disk + partitions)
     print(f"  Checking devices for LVM PVs: {list(devices_to_check)}")
@@ -2009,7 +2418,9 @@ def _deactivate_lvm_on_disk(disk_device, progress_callback=None):
              all_success = False
          else:
               print(f"    Successfully deactivated VG {vg_name}.")
-              time.sleep(0.5) # Small delay after deactivation
+    if vg_names_found:
+         # Wait for the LV removal events instead of a fixed delay per VG
+         _udev_settle(timeout=10)
               
     if progress_callback:
          status = "Deactivation complete." if all_success and not errors else "Deactivation attempted, some errors occurred."
@@ -2032,13 +2443,7 @@ def _remove_dm_mappings(disk_device, progress_callback=None):
     errors = []
 
     # 1. Find partitions (same logic as _deactivate_lvm_on_disk)
-    try:
-        lsblk_cmd = ["lsblk", "-n", "-o", "PATH", "--raw", disk_device]
-        lsblk_result = subprocess.run(lsblk_cmd, capture_output=True, text=True, check=False, timeout=10)
-        if lsblk_result.returncode == 0:
-            devices_to_check.update([p.strip() for p in lsblk_result.stdout.split('\n') if p.strip()])
-    except Exception:
-        pass # Ignore errors, just use base disk device
+    devices_to_check.update(_list_disk_device_paths(disk_device))
 
     # 2. Find VGs associated with each device
     for device in devices_to_check:
@@ -2095,7 +2500,6 @@ def _remove_dm_mappings(disk_device, progress_callback=None):
         
         if dm_success:
             print(f"    Successfully removed DM mapping {mapper_name}.")
-            time.sleep(0.5) # Small delay
         else:
             # If basename fails, try the full path (less common for dmsetup remove)
             if "No such device or address" not in dm_err:
@@ -2104,7 +2508,6 @@ def _remove_dm_mappings(disk_device, progress_callback=None):
                 dm_success_fp, dm_err_fp, _ = _run_command(dmsetup_cmd_fullpath, f"Remove DM mapping {lv_path}")
                 if dm_success_fp:
                      print(f"    Successfully removed DM mapping using full path {lv_path}.")
-                     time.sleep(0.5) # Small delay
                 elif "No such device or address" not in dm_err_fp:
                     # Only report error if it wasn't already gone
                     err_msg = f"Failed to remove DM mapping {mapper_name} (and {lv_path}): {dm_err_fp}"
@@ -0,0 +1,6 @@
+# centrio_installer/ui/__init__.py
+
+# Pin the GI namespace versions once for every page module
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
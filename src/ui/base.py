@@ -1,13 +1,7 @@
 # centrio_installer/ui/base.py
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw
 
-# Fixed import - use absolute import
-import backend
-
 class BaseConfigurationPage(Adw.PreferencesPage):
     """Base class for configuration ui with common functionality."""
     
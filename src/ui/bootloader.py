@@ -1,8 +1,5 @@
 # centrio_installer/ui/bootloader.py
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw
 
 from .base import BaseConfigurationPage
@@ -1,21 +1,30 @@
 # centrio_installer/ui/disk.py
 
-import gi
 import subprocess # For running lsblk
-import json       # For parsing lsblk output
+try:
+    import orjson as _json # Faster lsblk/findmnt JSON parsing when available
+except ImportError:
+    import json as _json   # For parsing lsblk output
 import shlex      # For safe command string generation
 import os         # For path manipulation
 import re # For parsing losetup
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib
+import time # For the scan cache staleness window
+import logging
+import functools
+from gi.repository import Gtk, Adw, GLib, Gio, GObject
 
 from .base import BaseConfigurationPage
 # D-Bus imports are no longer needed here
 # from ..utils import dasbus, DBusError, dbus_available 
 # from ..constants import (...) 
 
-# Helper function to format size
+log = logging.getLogger(__name__)
+
+# First device name in `dmsetup deps -o devname` output
+_DMSETUP_DEP_RE = re.compile(r"^\s*(\S+)")
+
+# Helper function to format size (cached: ListView rebinds call it for the same sizes repeatedly)
+@functools.lru_cache(maxsize=128)
 def format_bytes(size_bytes):
     if size_bytes is None:
         return "N/A"
@@ -28,6 +37,18 @@ def format_bytes(size_bytes):
 
 # --- Enhanced Partitioning Command Generators ---
 
+# mkfs invocation per supported root filesystem (ext4 is the fallback)
+_MKFS_CMDS = {
+    "ext4": ("mkfs.ext4", "-F"),
+    "btrfs": ("mkfs.btrfs", "-f"),
+    "xfs": ("mkfs.xfs", "-f"),
+}
+
+def get_partition_prefix(disk_path):
+    """Returns the partition name separator for a disk ("p" for nvme0n1, mmcblk0, loop0...)."""
+    # Kernel rule: if the disk name ends in a digit, partitions are named <disk>p<N>
+    return "p" if disk_path and disk_path[-1].isdigit() else ""
+
 def generate_wipefs_command(disk_path):
     """Generates the wipefs command for a disk."""
     return ["wipefs", "-a", disk_path]
@@ -97,15 +118,9 @@ def generate_mkfs_commands(disk_path, filesystem="btrfs", partition_prefix="", d
         root_part = f"{disk_path}{partition_prefix}1"
 
     # Format root partition with selected filesystem
-    if filesystem == "ext4":
-        commands.append(["mkfs.ext4", "-F", root_part])
-    elif filesystem == "btrfs":
-        commands.append(["mkfs.btrfs", "-f", root_part])
-    elif filesystem == "xfs":
-        commands.append(["mkfs.xfs", "-f", root_part])
-    else:
-        # Fallback to ext4
-        commands.append(["mkfs.ext4", "-F", part2])
+    if filesystem not in _MKFS_CMDS:
+        print(f"Warning: Unsupported filesystem '{filesystem}', falling back to ext4")
+    commands.append([*_MKFS_CMDS.get(filesystem, _MKFS_CMDS["ext4"]), root_part])
     
     return commands
 
@@ -116,8 +131,8 @@ def get_host_mounts():
     mounts = {}
     try:
         cmd = ["findmnt", "-J", "-o", "SOURCE,TARGET,FSTYPE,OPTIONS"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
-        mount_data = json.loads(result.stdout)
+        result = subprocess.run(cmd, capture_output=True, check=True, timeout=5)
+        mount_data = _json.loads(result.stdout) # orjson and json both accept bytes directly
         if "filesystems" in mount_data:
             for fs in mount_data["filesystems"]:
                 source = fs.get("source")
@@ -135,9 +150,9 @@ def get_host_lvm_pvs():
     pvs = set()
     try:
         cmd = ["pvs", "--noheadings", "-o", "pv_name"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
+        result = subprocess.run(cmd, capture_output=True, check=True, timeout=5)
         for line in result.stdout.splitlines():
-            pv_name = line.strip()
+            pv_name = line.strip().decode(errors="replace")
             if pv_name:
                 try:
                     real_path = os.path.realpath(pv_name)
@@ -154,9 +169,9 @@ def detect_existing_efi_partitions():
     """Detect existing EFI system partitions that could be reused for dual boot."""
     efi_partitions = []
     try:
-        cmd = ["lsblk", "-J", "-o", "PATH,FSTYPE,PARTTYPE,SIZE"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=10)
-        lsblk_data = json.loads(result.stdout)
+        cmd = ["lsblk", "-J", "-b", "-o", "PATH,FSTYPE,PARTTYPE,SIZE"] # -b: numeric sizes for format_bytes
+        result = subprocess.run(cmd, capture_output=True, check=True, timeout=10)
+        lsblk_data = _json.loads(result.stdout)
         
         def scan_device(device):
             path = device.get("path")
@@ -191,6 +206,161 @@ def detect_existing_efi_partitions():
     
     return efi_partitions
 
+# Columns the disk scan reads; NAME is redundant with PATH under -p
+LSBLK_SCAN_COLUMNS = "PATH,SIZE,MODEL,TYPE,PKNAME,MOUNTPOINT"
+# Seconds before a disk scan lsblk is considered hung
+LSBLK_TIMEOUT = 5
+# KEY="value" pairs in `lsblk --pairs` output
+_LSBLK_PAIR_RE = re.compile(r'(\w+)="([^"]*)"')
+
+def _parse_lsblk_pairs(output):
+    """Fallback for util-linux without JSON output: parses `lsblk --pairs` bytes into a flat device list."""
+    devices = []
+    for line in output.decode(errors="replace").splitlines():
+        dev = {key.lower(): value for key, value in _LSBLK_PAIR_RE.findall(line)}
+        if not dev:
+            continue
+        # Match the JSON mode's types: numeric size, null for empty columns
+        size = dev.get("size", "")
+        dev["size"] = int(size) if size.isdigit() else None
+        for key in ("model", "pkname", "mountpoint"):
+            if not dev.get(key):
+                dev[key] = None
+        devices.append(dev)
+    return devices
+
+# Kernel block devices that are never installation targets
+SYSFS_SKIP_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "sr", "fd")
+
+# How long a previous scan result may be reused when sysfs looks unchanged (seconds)
+SCAN_CACHE_TTL = 2.0
+
+def _sysfs_block_key():
+    """Returns the mtimes of the sysfs block directories, or None if they cannot be read."""
+    try:
+        return (os.stat("/sys/block").st_mtime_ns, os.stat("/sys/class/block").st_mtime_ns)
+    except OSError:
+        return None
+
+def _read_sysfs_attr(path):
+    """Reads a single sysfs attribute, returning None if it is missing."""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _enum_disks_sysfs():
+    """Lists physical disks by reading /sys/block directly (no lsblk spawn).
+    Returns dicts shaped like lsblk disk entries: name, path, size, model, type, removable.
+    """
+    disks = []
+    try:
+        entries = sorted(os.scandir("/sys/block"), key=lambda e: e.name)
+    except OSError as e:
+        print(f"Warning: Failed to read /sys/block: {e}")
+        return disks
+    for entry in entries:
+        name = entry.name
+        if name.startswith(SYSFS_SKIP_PREFIXES):
+            continue
+        base = entry.path
+        sectors = _read_sysfs_attr(f"{base}/size")
+        model = _read_sysfs_attr(f"{base}/device/model")
+        if not model:
+            vendor = _read_sysfs_attr(f"{base}/device/vendor")
+            model = vendor if vendor and not vendor.startswith("0x") else None # virtio exposes a raw PCI id here
+        disks.append({
+            "name": name,
+            "path": "/dev/" + name.replace("!", "/"), # e.g. cciss!c0d0 -> /dev/cciss/c0d0
+            "size": int(sectors) * 512 if sectors and sectors.isdigit() else None, # Always 512-byte units
+            "model": model or "Unknown Model",
+            "type": "disk",
+            "removable": _read_sysfs_attr(f"{base}/removable") == "1"
+        })
+    return disks
+
+# Widgets of one disk row; properties are applied by GtkBuilder instead of per-widget Python setters.
+# The radio is display-only: selection is driven by the list, the radio just mirrors it.
+_DISK_ROW_UI = """
+<interface>
+  <object class="AdwActionRow" id="row">
+    <child type="suffix">
+      <object class="GtkImage" id="warning_icon">
+        <property name="icon-name">dialog-warning-symbolic</property>
+        <property name="tooltip-text">This disk contains the live operating system</property>
+      </object>
+    </child>
+    <child type="suffix">
+      <object class="GtkCheckButton" id="radio">
+        <property name="valign">center</property>
+        <property name="can-target">False</property>
+      </object>
+    </child>
+  </object>
+</interface>
+"""
+
+class DiskItem(GObject.Object):
+    """A detected disk as held in the disk list store."""
+    path = GObject.Property(type=str, default="")
+    model = GObject.Property(type=str, default="")
+    size = GObject.Property(type=GObject.TYPE_INT64, default=-1) # Bytes, -1 if unknown
+    is_live_os_disk = GObject.Property(type=bool, default=False)
+
+def _sysfs_disk_for_devnum(dev_num, visited=None):
+    """Walks sysfs from a block device number up to its physical disk.
+    Follows partitions to their disk, dm/md devices to their slaves and loop devices to their
+    backing file's device. Returns the disk's /dev path, or None if the chain cannot be resolved.
+    """
+    visited = set() if visited is None else visited
+    if dev_num in visited:
+        return None
+    visited.add(dev_num)
+    try:
+        sys_path = os.path.realpath(f"/sys/dev/block/{os.major(dev_num)}:{os.minor(dev_num)}")
+        if os.path.exists(f"{sys_path}/partition"):
+            sys_path = os.path.dirname(sys_path) # Partition -> its disk
+        name = os.path.basename(sys_path)
+        if name.startswith("loop"):
+            backing_file = _read_sysfs_attr(f"{sys_path}/loop/backing_file")
+            if not backing_file or backing_file.endswith("(deleted)"):
+                return None
+            return _sysfs_disk_for_devnum(os.stat(backing_file).st_dev, visited)
+        if name.startswith(("dm-", "md")):
+            slaves = sorted(os.listdir(f"{sys_path}/slaves"))
+            if not slaves:
+                return None
+            return _sysfs_disk_for_devnum(os.stat(f"/dev/{slaves[0]}").st_rdev, visited)
+        return "/dev/" + name.replace("!", "/")
+    except OSError as e:
+        print(f"  sysfs trace failed for device {os.major(dev_num)}:{os.minor(dev_num)}: {e}")
+        return None
+
+def _sysfs_live_os_disk():
+    """Finds the physical disk backing the live OS root ('/') from mountinfo and sysfs.
+    Returns (resolved, disk_path). resolved is False when sysfs alone could not answer and
+    the lsblk trace should be used instead; disk_path is None if '/' is not on a block device.
+    """
+    root_dev = None
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 4 and fields[4] == "/":
+                    root_dev = fields[2] # Last '/' entry wins (overmounts)
+    except OSError as e:
+        print(f"Warning: Failed to read /proc/self/mountinfo: {e}")
+        return False, None
+    if root_dev is None:
+        return False, None
+    major, minor = (int(x) for x in root_dev.split(":"))
+    if major == 0:
+        # overlay/tmpfs/squashfs-on-nothing root: no block device hosts '/'
+        return True, None
+    disk = _sysfs_disk_for_devnum(os.makedev(major, minor))
+    return disk is not None, disk
+
 class DiskPage(BaseConfigurationPage):
     def __init__(self, main_window, overlay_widget, **kwargs):
         super().__init__(title="Installation Destination", subtitle="Configure disk partitioning and filesystem", main_window=main_window, overlay_widget=overlay_widget, **kwargs)
@@ -205,8 +375,17 @@ class DiskPage(BaseConfigurationPage):
         self.preserve_efi = False
         self.selected_efi_partition = None
         self.custom_format_enabled = False
-        self.disk_widgets = {}
+        self.efi_size = 512 # MiB, kept in sync with efi_size_row
+        self._state_update_pending = False # An idle button-state update is queued
         self.efi_partitions = []
+        self._efi_rows = [] # Rows currently shown in efi_group
+        self._trace_cache = {} # path -> physical disk, reset per scan
+        self._scan_cache = None # detected_disks from the last successful scan
+        self._scan_cache_key = None
+        self._scan_cache_ts = 0.0
+        self._scan_key = None
+        self._lsblk_watchdog_id = None
+        self._lsblk_timed_out = False
         
         self._build_ui()
             
@@ -233,6 +412,30 @@ class DiskPage(BaseConfigurationPage):
         self.disk_list_group.set_description("Select disk(s) for installation")
         self.disk_list_group.set_visible(False)
         self.add(self.disk_list_group)
+
+        # Virtualised list: rows are created per visible item and recycled, not per disk
+        self.disk_store = Gio.ListStore(item_type=DiskItem)
+        self.disk_selection = Gtk.SingleSelection(model=self.disk_store, autoselect=False, can_unselect=False)
+        self.disk_selection.connect("notify::selected", self.on_disk_selection_changed)
+        disk_factory = Gtk.SignalListItemFactory()
+        disk_factory.connect("setup", self._on_disk_row_setup)
+        disk_factory.connect("bind", self._on_disk_row_bind)
+        self.disk_list_view = Gtk.ListView(model=self.disk_selection, factory=disk_factory)
+        self.disk_list_view.set_single_click_activate(False)
+        self.disk_list_view.add_css_class("card")
+        disk_scroller = Gtk.ScrolledWindow(child=self.disk_list_view)
+        disk_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        disk_scroller.set_propagate_natural_height(True)
+        disk_scroller.set_max_content_height(360)
+        self.disk_list_group.add(disk_scroller)
+
+        self.disk_placeholder_row = Adw.ActionRow(
+            title="No suitable disks found", 
+            subtitle="Cannot proceed with installation."
+        )
+        self.disk_placeholder_row.set_activatable(False)
+        self.disk_placeholder_row.set_visible(False)
+        self.disk_list_group.add(self.disk_placeholder_row)
         
         # Installation mode section
         self.mode_group = Adw.PreferencesGroup(title="Installation Mode")
@@ -306,6 +509,7 @@ class DiskPage(BaseConfigurationPage):
         )
         adjustment = Gtk.Adjustment(value=512, lower=100, upper=2048, step_increment=50)
         self.efi_size_row.set_adjustment(adjustment)
+        self.efi_size_row.connect("notify::value", self.on_efi_size_changed)
         self.advanced_group.add(self.efi_size_row)
         
         # Confirm button
@@ -366,6 +570,10 @@ class DiskPage(BaseConfigurationPage):
         self.advanced_group.set_visible(self.custom_format_enabled)
         print(f"Custom formatting: {self.custom_format_enabled}")
     
+    def on_efi_size_changed(self, spin_row, pspec):
+        """Cache the EFI partition size as whole MiB whenever the spin row changes."""
+        self.efi_size = round(spin_row.get_value())
+
     def on_efi_partition_selected(self, button, partition_path):
         """Handle EFI partition selection for dual boot."""
         if button.get_active():
@@ -376,14 +584,14 @@ class DiskPage(BaseConfigurationPage):
             if self.selected_efi_partition == partition_path:
                 self.selected_efi_partition = None
                 self.preserve_efi = False
-        self.update_complete_button_state()
+        self._queue_state_update() # Old radio's "off" and new radio's "on" arrive as a pair
     
     def _populate_efi_partitions(self):
         """Populate the EFI partition selection UI."""
-        # Clear existing rows
-        # In GTK 4, we need to remove rows differently
-        for widget in list(self.efi_group):
-            self.efi_group.remove(widget)
+        # Clear existing rows (tracked, so no child-widget enumeration needed)
+        for row in self._efi_rows:
+            self.efi_group.remove(row)
+        self._efi_rows.clear()
         
         efi_radio_group = None
         for i, efi_part in enumerate(self.efi_partitions):
@@ -407,8 +615,21 @@ class DiskPage(BaseConfigurationPage):
             row.add_suffix(radio)
             row.set_activatable_widget(radio)
             self.efi_group.add(row)
+            self._efi_rows.append(row)
 
     def find_physical_disk_for_path(self, target_path, block_devices):
+        """Traces a given path back to its parent physical disk, memoized for the current scan."""
+        if target_path in self._trace_cache:
+            return self._trace_cache[target_path]
+        visited = set()
+        result = self._trace_physical_disk(target_path, block_devices, visited)
+        # Every hop on the chain resolves to the same disk
+        for path in visited:
+            self._trace_cache[path] = result
+        self._trace_cache[target_path] = result
+        return result
+
+    def _trace_physical_disk(self, target_path, block_devices, visited):
         """Traces a given path back to its parent physical disk using lsblk data, handling loop devices."""
         print(f"--- Tracing physical disk for path: {target_path} ---")
         if not block_devices or not target_path:
@@ -428,9 +649,12 @@ class DiskPage(BaseConfigurationPage):
 
         # Trace upwards from the target_path
         current_path = target_path
-        visited = set() # Prevent infinite loops
+        # visited (filled in by the caller's set) prevents infinite loops
 
         while current_path and current_path not in visited:
+            if current_path in self._trace_cache:
+                print(f"  Reusing earlier trace for {current_path}")
+                return self._trace_cache[current_path]
             visited.add(current_path)
             print(f"  Tracing: current_path = {current_path}")
 
@@ -509,7 +733,7 @@ class DiskPage(BaseConfigurationPage):
                            # Output format: " device_name (major:minor)\n ..."
                            # We want the first device_name
                            deps_output = result_dmsetup.stdout.strip()
-                           match = re.search(r"^\s*(\S+)", deps_output) # Find first non-whitespace sequence
+                           match = _DMSETUP_DEP_RE.search(deps_output) # Find first non-whitespace sequence
                            if match:
                                 underlying_dev = match.group(1)
                                 # Ensure it's a device path
@@ -565,14 +789,13 @@ class DiskPage(BaseConfigurationPage):
         return None
 
     def scan_for_disks(self, button):
-        """Runs lsblk once, identifies the live OS disk, checks usage, and updates the UI."""
+        """Resets the page and scans disks from sysfs, falling back to an async lsblk (_on_lsblk_done)."""
         print("Scanning for disks using lsblk...")
         button.set_sensitive(False)
         self.show_toast("Scanning for storage devices...")
         self.scan_completed = False
         self.partitioning_method = None
-        self.selected_disks = set()
-        self.disk_widgets = {}
+        self._trace_cache = {}
         
         # Clear previous UI state
         self.disk_list_group.set_visible(False)
@@ -585,15 +808,103 @@ class DiskPage(BaseConfigurationPage):
         self.normal_radio.set_active(False)
         self.dual_boot_radio.set_active(False)
 
+        # Reuse the previous scan if no block device was added/removed in the meantime
+        self._scan_key = _sysfs_block_key()
+        if (self._scan_cache is not None and self._scan_key is not None
+                and self._scan_key == self._scan_cache_key
+                and time.monotonic() - self._scan_cache_ts < SCAN_CACHE_TTL):
+            print("Block devices unchanged since last scan, reusing cached results.")
+            self.detected_disks = list(self._scan_cache)
+            self._show_scan_results()
+            button.set_sensitive(True)
+            self.update_complete_button_state()
+            return
+
+        # Fast path: sysfs + mountinfo answer both questions without spawning lsblk
+        disk_devices = _enum_disks_sysfs()
+        resolved, live_os_disk_path = _sysfs_live_os_disk()
+        if disk_devices and resolved:
+            print(f"--- Live OS physical disk via sysfs: {live_os_disk_path} ---")
+            try:
+                self._build_detected_disks(disk_devices, live_os_disk_path)
+            except Exception as e:
+                print(f"ERROR: Unexpected error during disk scan: {e}")
+                self.show_toast(f"An unexpected error occurred during disk scan.")
+            finally:
+                button.set_sensitive(True)
+                self.update_complete_button_state()
+            return
+        print("sysfs could not resolve the disks or live OS root, falling back to lsblk.")
+
+        # Run lsblk ONCE, get JSON tree, include MOUNTPOINT
+        # Gio.Subprocess keeps the main loop pumping while lsblk walks sysfs/udev
+        if not self._spawn_lsblk(button, pairs=False):
+            button.set_sensitive(True)
+            self.update_complete_button_state()
+
+    def _spawn_lsblk(self, button, pairs):
+        """Starts the scan lsblk (JSON, or --pairs if pairs) under the LSBLK_TIMEOUT watchdog; False if it could not start."""
+        cmd = ["lsblk", "-P" if pairs else "-J", "-b", "-p", "-o", LSBLK_SCAN_COLUMNS]
+        print(f"Running: {' '.join(cmd)}")
         try:
-            # Run lsblk ONCE, get JSON tree, include MOUNTPOINT
-            cmd = ["lsblk", "-J", "-b", "-p", "-o", "NAME,PATH,SIZE,MODEL,TYPE,PKNAME,MOUNTPOINT"]
-            print(f"Running: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=10)
-            lsblk_data = json.loads(result.stdout)
+            proc = Gio.Subprocess.new(cmd, Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE)
+        except GLib.Error as e:
+            print(f"ERROR: Failed to start lsblk: {e.message}")
+            self.show_toast("Error: lsblk command not found. Cannot scan disks.")
+            return False
+        # lsblk can wedge on failing controllers; kill it rather than wait forever
+        self._lsblk_timed_out = False
+        self._lsblk_watchdog_id = GLib.timeout_add_seconds(LSBLK_TIMEOUT, self._on_lsblk_timeout, proc)
+        proc.communicate_async(None, None, self._on_lsblk_done, (button, pairs))
+        return True
+
+    def _on_lsblk_timeout(self, proc):
+        """Kills a hung lsblk; _on_lsblk_done then reports the timeout."""
+        print(f"ERROR: lsblk did not finish within {LSBLK_TIMEOUT}s, terminating it.")
+        self._lsblk_watchdog_id = None
+        self._lsblk_timed_out = True
+        proc.force_exit()
+        return GLib.SOURCE_REMOVE
+
+    def _on_lsblk_done(self, proc, result, scan):
+        """Parses lsblk output, identifies the live OS disk, checks usage, and updates the UI.
+        scan is (button, pairs); a failed JSON run restarts the scan with the --pairs fallback."""
+        button, pairs = scan
+        retrying = False
+        try:
+            if self._lsblk_watchdog_id is not None:
+                GLib.source_remove(self._lsblk_watchdog_id)
+                self._lsblk_watchdog_id = None
+            _ok, stdout, stderr = proc.communicate_finish(result)
+            if self._lsblk_timed_out:
+                self.show_toast("Disk scan timed out.")
+                return
+
+            all_block_devices = None
+            if pairs:
+                if not proc.get_successful():
+                    stderr_text = bytes(stderr.get_data()).decode(errors="replace").strip() if stderr else ""
+                    print(f"ERROR: lsblk failed with exit status {proc.get_exit_status()}")
+                    print(f"Stderr: {stderr_text}")
+                    self.show_toast(f"Error running lsblk: {stderr_text}")
+                    return
+                all_block_devices = _parse_lsblk_pairs(bytes(stdout.get_data()) if stdout else b"")
+            elif proc.get_successful():
+                try:
+                    lsblk_data = _json.loads(bytes(stdout.get_data()) if stdout else b"{}") # Raw bytes, no separate decode pass
+                    all_block_devices = lsblk_data.get("blockdevices", [])
+                except _json.JSONDecodeError as e:
+                    print(f"Warning: Failed to parse lsblk JSON output: {e}")
+            else:
+                stderr_text = bytes(stderr.get_data()).decode(errors="replace").strip() if stderr else ""
+                print(f"Warning: lsblk -J failed with exit status {proc.get_exit_status()}: {stderr_text}")
+            if all_block_devices is None:
+                # util-linux older than 2.27 has no JSON output mode
+                print("Retrying disk scan with lsblk --pairs output...")
+                retrying = self._spawn_lsblk(button, pairs=True)
+                return
             
             self.detected_disks = []
-            all_block_devices = lsblk_data.get("blockdevices", [])
             live_os_disk_path = None
 
             # --- Find the physical disk hosting the live OS root ('/') ---
@@ -636,133 +947,153 @@ class DiskPage(BaseConfigurationPage):
                  print("--- WARNING: Could not find root mountpoint '/' in lsblk output! ---")
             # --- Finished searching for live OS disk ---
 
-            # --- Process all detected physical disks ---
-            print("--- Processing detected disks ---")
-            for device in all_block_devices:
-                if device.get("type") == "disk" and not any(s in (device.get("model") or "").upper() for s in ["CD", "DVD"]):
-                    disk_path = device.get("path")
-                    if not disk_path: continue
-
-                    # Mark disk as unusable only if it's the one hosting the live OS
-                    is_live_os_disk = (disk_path == live_os_disk_path)
-                    
-                    print(f"  Processing disk: {disk_path}, Is Live OS Disk? {is_live_os_disk}")
-
-                    disk_info = {
-                        "name": device.get("name", "N/A"),
-                        "path": disk_path,
-                        "size": device.get("size"),
-                        "model": device.get("model", "Unknown Model").strip(),
-                        "is_live_os_disk": is_live_os_disk # Changed flag name
-                    }
-                    self.detected_disks.append(disk_info)
-
-            print(f"Detected disks list: {self.detected_disks}")
-            self._populate_disk_list()
-            self.scan_completed = True
-            self.show_toast(f"Scan complete. Found {len(self.detected_disks)} disk(s).")
-            
-            if self.detected_disks:
-                self.disk_list_group.set_visible(True)
-                self.mode_group.set_visible(True)
-                self.fs_group.set_visible(True)
-                self.normal_radio.set_active(True)  # Default to normal install
-            else:
-                 self.show_toast("No suitable disks found for installation.")
+            # Disk list comes from sysfs; lsblk is only needed above to trace the live OS disk
+            disk_devices = _enum_disks_sysfs()
+            if not disk_devices:
+                print("  sysfs enumeration found no disks, falling back to lsblk output.")
+                disk_devices = all_block_devices
+            self._build_detected_disks(disk_devices, live_os_disk_path)
 
-        except FileNotFoundError:
-            print("ERROR: lsblk command not found.")
-            self.show_toast("Error: lsblk command not found. Cannot scan disks.")
-        except subprocess.CalledProcessError as e:
-            print(f"ERROR: lsblk failed: {e}")
-            print(f"Stderr: {e.stderr}")
-            self.show_toast(f"Error running lsblk: {e.stderr}")
-        except json.JSONDecodeError as e:
-            print(f"ERROR: Failed to parse lsblk JSON output: {e}")
-            self.show_toast("Error parsing disk information.")
-        except subprocess.TimeoutExpired:
-            print("ERROR: lsblk command timed out.")
-            self.show_toast("Disk scan timed out.")
+        except GLib.Error as e:
+            print(f"ERROR: Failed to read lsblk output: {e.message}")
+            self.show_toast(f"Error running lsblk: {e.message}")
         except Exception as e:
             print(f"ERROR: Unexpected error during disk scan: {e}")
             self.show_toast(f"An unexpected error occurred during disk scan.")
         finally:
-            # Re-enable scan button regardless of outcome
-            button.set_sensitive(True)
-            self.update_complete_button_state()
+            # Re-enable scan button regardless of outcome, unless the --pairs retry is still running
+            if not retrying:
+                button.set_sensitive(True)
+                self.update_complete_button_state()
             
-    def _populate_disk_list(self):
-        """Populate the disk list with detected disks."""
-        # Clear existing rows
-        # In GTK 4, we need to remove rows differently
-        for widget in list(self.disk_list_group):
-            self.disk_list_group.remove(widget)
+    def _build_detected_disks(self, disk_devices, live_os_disk_path):
+        """Builds self.detected_disks from disk entries, caches them and shows the result."""
+        # --- Process all detected physical disks ---
+        print("--- Processing detected disks ---")
+        self.detected_disks = []
+        for device in disk_devices:
+            if device.get("type") == "disk" and not any(s in (device.get("model") or "").upper() for s in ["CD", "DVD"]):
+                disk_path = device.get("path")
+                if not disk_path: continue
+
+                # Mark disk as unusable only if it's the one hosting the live OS
+                is_live_os_disk = (disk_path == live_os_disk_path)
+                
+                print(f"  Processing disk: {disk_path}, Is Live OS Disk? {is_live_os_disk}")
+
+                disk_info = {
+                    "name": device.get("name") or os.path.basename(disk_path),
+                    "path": disk_path,
+                    "size": device.get("size"),
+                    "model": (device.get("model") or "Unknown Model").strip(),
+                    "is_live_os_disk": is_live_os_disk, # Changed flag name
+                    "part_prefix": get_partition_prefix(disk_path) # Computed once per scan
+                }
+                self.detected_disks.append(disk_info)
+
+        print(f"Detected disks list: {self.detected_disks}")
+        self._scan_cache = list(self.detected_disks)
+        self._scan_cache_key = self._scan_key
+        self._scan_cache_ts = time.monotonic()
+        self._show_scan_results()
+
+    def _show_scan_results(self):
+        """Shows self.detected_disks and reveals the options that depend on them."""
+        self._populate_disk_list()
+        self.scan_completed = True
+        self.show_toast(f"Scan complete. Found {len(self.detected_disks)} disk(s).")
         
-        self.disk_widgets = {}
+        if self.detected_disks:
+            self.disk_list_group.set_visible(True)
+            self.mode_group.set_visible(True)
+            self.fs_group.set_visible(True)
+            self.normal_radio.set_active(True)  # Default to normal install
+        else:
+             self.show_toast("No suitable disks found for installation.")
+
+    def _populate_disk_list(self):
+        """Fill the disk store with detected disks; the ListView recycles rows for them."""
+        previous_path = next(iter(self.selected_disks), None)
+        self.selected_disks = set()
 
         if not self.detected_disks:
-            row = Adw.ActionRow(
-                title="No suitable disks found", 
-                subtitle="Cannot proceed with installation."
-            )
-            row.set_activatable(False)
-            self.disk_list_group.add(row)
+            self.disk_store.remove_all()
+            self.disk_list_view.set_visible(False)
+            self.disk_placeholder_row.set_visible(True)
             return
+        self.disk_placeholder_row.set_visible(False)
+        self.disk_list_view.set_visible(True)
 
-        disk_radio_group = None
-        found_usable_disk = False
-        
+        select_index = Gtk.INVALID_LIST_POSITION
+        items = []
         for i, disk in enumerate(self.detected_disks):
-            disk_path = disk["path"]
-            disk_size_str = format_bytes(disk["size"])
-            title = f"{disk['model']} ({disk_path})"
-            subtitle = f"Size: {disk_size_str}"
-            
-            row = Adw.ActionRow(title=title, subtitle=subtitle)
-            
-            if disk["is_live_os_disk"]: 
+            if disk["is_live_os_disk"]:
                  print(f"!!! UI Update: Marking {disk['path']} (Live OS Disk) as insensitive.")
-                 row.set_subtitle(subtitle + " (Live OS Disk - Cannot select)")
-                 row.set_sensitive(False) 
-                 warning_icon = Gtk.Image.new_from_icon_name("dialog-warning-symbolic")
-                 warning_icon.set_tooltip_text("This disk contains the live operating system")
-                 row.add_suffix(warning_icon)
-            else:
-                 found_usable_disk = True
-                 radio = Gtk.CheckButton() if i == 0 else Gtk.CheckButton(group=disk_radio_group)
-                 if i == 0:
-                     disk_radio_group = radio
-                     radio.set_active(True)  # Select first usable disk by default
-                     self.selected_disks.add(disk_path)
-                 
-                 radio.set_valign(Gtk.Align.CENTER)
-                 radio.connect("toggled", self.on_disk_toggled, disk_path)
-                 row.add_suffix(radio)
-                 row.set_activatable_widget(radio)
-                 self.disk_widgets[disk_path] = {"row": row, "radio": radio}
-
-            self.disk_list_group.add(row)
-            
-        if not found_usable_disk:
+            elif select_index == Gtk.INVALID_LIST_POSITION or disk["path"] == previous_path:
+                 select_index = i  # Keep the previous selection, else the first usable disk
+            items.append(DiskItem(
+                path=disk["path"],
+                model=disk["model"],
+                size=disk["size"] if disk["size"] is not None else -1,
+                is_live_os_disk=disk["is_live_os_disk"]
+            ))
+        # One splice = one items-changed emission, so the ListView relayouts once
+        self.disk_store.splice(0, self.disk_store.get_n_items(), items)
+
+        if select_index == Gtk.INVALID_LIST_POSITION:
              print("Warning: No usable disks detected (only Live OS disk found?).")
+        self.disk_selection.set_selected(select_index)
+        self.on_disk_selection_changed(self.disk_selection, None)
 
-    def on_disk_toggled(self, radio_button, disk_path):
-        """Handle disk selection toggle."""
-        print(f"--- Toggle event for {disk_path} ---")
-        
-        if radio_button.get_active():
-            print(f"  Adding {disk_path} to selected_disks.")
-            self.selected_disks.clear()  # Only one disk at a time for now
-            self.selected_disks.add(disk_path)
+    def _on_disk_row_setup(self, factory, list_item):
+        """Create the widgets for one recycled disk row from the _DISK_ROW_UI template."""
+        builder = Gtk.Builder.new_from_string(_DISK_ROW_UI, -1)
+        row = builder.get_object("row")
+        row.radio = builder.get_object("radio")
+        row.warning_icon = builder.get_object("warning_icon")
+        list_item.bind_property("selected", row.radio, "active", GObject.BindingFlags.SYNC_CREATE)
+        list_item.set_child(row)
+
+    def _on_disk_row_bind(self, factory, list_item):
+        """Copy a DiskItem's properties into its recycled row."""
+        disk = list_item.get_item()
+        row = list_item.get_child()
+        subtitle = f"Size: {format_bytes(disk.size if disk.size >= 0 else None)}"
+        if disk.is_live_os_disk:
+            subtitle += " (Live OS Disk - Cannot select)"
+        row.set_title(f"{disk.model} ({disk.path})")
+        row.set_subtitle(subtitle)
+        row.set_sensitive(not disk.is_live_os_disk)
+        row.radio.set_visible(not disk.is_live_os_disk)
+        row.warning_icon.set_visible(disk.is_live_os_disk)
+        list_item.set_selectable(not disk.is_live_os_disk)
+        list_item.set_activatable(not disk.is_live_os_disk)
+
+    def on_disk_selection_changed(self, selection, pspec):
+        """Handle disk selection changes in the disk list."""
+        disk = selection.get_selected_item()
+        print(f"--- Disk selection changed: {disk.path if disk else None} ---")
+        self.selected_disks.clear()  # Only one disk at a time for now
+        if disk is not None and not disk.is_live_os_disk:
+            self.selected_disks.add(disk.path)
         
+        self._queue_state_update()
+
+    def _queue_state_update(self):
+        """Schedule one update_complete_button_state for a burst of selection signals."""
+        # A repopulate or a radio switch emits several notifications back to back
+        if not self._state_update_pending:
+            self._state_update_pending = True
+            GLib.idle_add(self._do_state_update)
+
+    def _do_state_update(self):
+        """Idle callback for _queue_state_update."""
+        self._state_update_pending = False
         self.update_complete_button_state()
+        return False
 
     def update_complete_button_state(self):
         """Update the state of the complete button based on current selections."""
-        print(f"--- Updating button state ---")
-        print(f"  Selected disks: {self.selected_disks}")
-        print(f"  Partitioning method: {self.partitioning_method}")
-        
         can_proceed = (
             self.scan_completed and 
             len(self.selected_disks) > 0 and 
@@ -770,7 +1101,9 @@ class DiskPage(BaseConfigurationPage):
             (not self.dual_boot_enabled or self.selected_efi_partition is not None)
         )
         
-        print(f"  Setting Complete button sensitive: {can_proceed}")
+        # Runs on every selection change; keep it off stdout unless debugging
+        log.debug("Button state: disks=%s method=%s sensitive=%s",
+                  self.selected_disks, self.partitioning_method, can_proceed)
         self.complete_button.set_sensitive(can_proceed)
         
     def apply_settings_and_return(self, button):
@@ -792,12 +1125,12 @@ class DiskPage(BaseConfigurationPage):
              self.show_toast("Please select a disk for installation.")
              return
 
-        primary_disk = sorted(list(self.selected_disks))[0]
+        primary_disk = min(self.selected_disks)
         
         # Initialize config_values
         config_values = {
             "method": self.partitioning_method,
-            "target_disks": sorted(list(self.selected_disks)), 
+            "target_disks": sorted(self.selected_disks), 
             "filesystem": self.filesystem_type,
             "dual_boot": self.dual_boot_enabled,
             "preserve_efi": self.preserve_efi,
@@ -814,10 +1147,11 @@ class DiskPage(BaseConfigurationPage):
             is_uefi = os.path.exists("/sys/firmware/efi")
 
             # Get EFI size if custom formatting is enabled
-            efi_size = int(self.efi_size_row.get_value()) if self.custom_format_enabled else 512
+            efi_size = self.efi_size if self.custom_format_enabled else 512
             
             # Generate the command lists
-            partition_prefix = "p" if "nvme" in primary_disk else ""
+            disk_info = next((d for d in self.detected_disks if d["path"] == primary_disk), None)
+            partition_prefix = disk_info["part_prefix"] if disk_info else get_partition_prefix(primary_disk)
             
             print(f"=== DISK CONFIGURATION DEBUG ===")
             print(f"Primary disk: {primary_disk}")
@@ -900,8 +1234,9 @@ class DiskPage(BaseConfigurationPage):
                 print(f"Command {i+1}: {' '.join(cmd)}")
             print(f"=== END DISK CONFIGURATION DEBUG ===")
             
-            if config_values["commands"]:
-                 print(f"    Example command: {' '.join(shlex.quote(c) for c in config_values['commands'][0])}")
+            # Quoting is only worth doing when someone will see it
+            if config_values["commands"] and log.isEnabledFor(logging.DEBUG):
+                 log.debug("    Example command: %s", shlex.join(config_values["commands"][0]))
 
         print("Storage configuration confirmed. Returning to summary.")
         
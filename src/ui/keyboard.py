@@ -1,10 +1,7 @@
 # centrio_installer/ui/keyboard.py
 
-import gi
 import subprocess # For localectl
 import re         # For parsing localectl status
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw
 
 from .base import BaseConfigurationPage
@@ -1,17 +1,17 @@
 # centrio_installer/ui/language.py
 
-import gi
 import subprocess # For localectl
 import re         # For parsing localectl status
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib, Gio
 
 from .base import BaseConfigurationPage
 # Use locale list getter
 from utils import ana_get_available_locales
 # Removed D-Bus imports
 
+# Seconds to wait for `localectl set-locale` before giving up
+LOCALECTL_TIMEOUT = 10
+
 class LanguagePage(BaseConfigurationPage): # Renamed class slightly
     def __init__(self, main_window, overlay_widget, **kwargs):
         # Changed title and subtitle to reflect setting system locale
@@ -20,6 +20,8 @@ class LanguagePage(BaseConfigurationPage): # Renamed class slightly
         self.available_locales = {} # Dict: {code: display_name}
         self.current_locale = "en_US.UTF-8" # Default
         self.locale_codes = [] # List of codes for ComboRow model
+        self._localectl_watchdog_id = None # Timeout source guarding an in-flight set-locale
+        self._localectl_timed_out = False
 
         # --- Populate Locales List ---
         self.available_locales = ana_get_available_locales()
@@ -114,33 +116,57 @@ class LanguagePage(BaseConfigurationPage): # Renamed class slightly
         # Command to set the system locale (LANG variable)
         cmd = ["localectl", "set-locale", f"LANG={selected_locale}"]
         
+        # Run asynchronously: localed or a polkit prompt can take seconds, and the window must keep drawing
+        print(f"  Executing: {' '.join(cmd)}")
+        try:
+            proc = Gio.Subprocess.new(cmd, Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE)
+        except GLib.Error as e:
+            print(f"ERROR: localectl command could not be started: {e.message}")
+            self.show_toast("Error: localectl command not found. Cannot set locale.")
+            self.complete_button.set_sensitive(True) 
+            return
+        self._localectl_timed_out = False
+        self._localectl_watchdog_id = GLib.timeout_add_seconds(LOCALECTL_TIMEOUT, self._on_localectl_timeout, proc)
+        proc.communicate_utf8_async(None, None, self._on_localectl_done, (button, selected_locale))
+
+    def _on_localectl_timeout(self, proc):
+        """Kills a localectl call that did not return in time."""
+        print("ERROR: localectl set-locale command timed out.")
+        self._localectl_watchdog_id = None
+        self._localectl_timed_out = True
+        proc.force_exit()
+        return GLib.SOURCE_REMOVE
+
+    def _on_localectl_done(self, proc, result, user_data):
+        """Finishes apply_settings_and_return once localectl set-locale has exited."""
+        button, selected_locale = user_data
+        if self._localectl_watchdog_id is not None:
+            GLib.source_remove(self._localectl_watchdog_id)
+            self._localectl_watchdog_id = None
         try:
-            print(f"  Executing: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=10)
-            print(f"  localectl set-locale output: {result.stdout}")
+            _ok, stdout, stderr = proc.communicate_utf8_finish(result)
+        except GLib.Error as e:
+            print(f"ERROR: Unexpected error applying system locale: {e.message}")
+            self.show_toast(f"Unexpected error setting system locale: {e.message}")
+            self.complete_button.set_sensitive(True)
+            return
+
+        if self._localectl_timed_out:
+            self.show_toast("Setting system locale timed out.")
+            self.complete_button.set_sensitive(True) 
+        elif not proc.get_successful():
+            exit_code = proc.get_exit_status()
+            print(f"ERROR: localectl set-locale failed (Exit code: {exit_code}):")
+            print(f"Stderr: {stderr}")
+            print(f"Stdout: {stdout}")
+            error_msg = (stderr or "").strip() or f"localectl failed with exit code {exit_code}"
+            self.show_toast(f"Error setting system locale: {error_msg}")
+            self.complete_button.set_sensitive(True) 
+        else:
+            print(f"  localectl set-locale output: {stdout}")
             print("  System locale set successfully.")
             self.show_toast(f"System locale set to '{selected_locale}' successfully!")
             
             # Pass selected locale back
             config_values = {"locale": selected_locale}
-            super().mark_complete_and_return(button, config_values=config_values)
-            
-        except FileNotFoundError:
-            print("ERROR: localectl command not found.")
-            self.show_toast("Error: localectl command not found. Cannot set locale.")
-            self.complete_button.set_sensitive(True) 
-        except subprocess.CalledProcessError as e:
-            print(f"ERROR: localectl set-locale failed (Exit code: {e.returncode}):")
-            print(f"Stderr: {e.stderr}")
-            print(f"Stdout: {e.stdout}")
-            error_msg = e.stderr.strip() or f"localectl failed with exit code {e.returncode}"
-            self.show_toast(f"Error setting system locale: {error_msg}")
-            self.complete_button.set_sensitive(True) 
-        except subprocess.TimeoutExpired:
-            print("ERROR: localectl set-locale command timed out.")
-            self.show_toast("Setting system locale timed out.")
-            self.complete_button.set_sensitive(True) 
-        except Exception as e:
-            print(f"ERROR: Unexpected error applying system locale: {e}")
-            self.show_toast(f"Unexpected error setting system locale: {e}")
-            self.complete_button.set_sensitive(True) 
\ No newline at end of file
+            super().mark_complete_and_return(button, config_values=config_values) 
\ No newline at end of file
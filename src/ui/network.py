@@ -1,11 +1,7 @@
 # centrio_installer/ui/network.py
 
-import gi
 import subprocess
 import threading
-import time
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 
 from .base import BaseConfigurationPage
@@ -1,60 +1,81 @@
 # centrio_installer/ui/payload.py
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
+import sys
+import logging
+import functools
+import itertools
+from types import MappingProxyType
 from gi.repository import Gtk, Adw, GLib
 
 from .base import BaseConfigurationPage
 
-# Default package groups and packages
+log = logging.getLogger(__name__)
+
+# Default package groups and packages (read-only; per-page selection lives in PayloadPage._group_selected)
 DEFAULT_PACKAGE_GROUPS = {
     "core": {
         "name": "Core System",
         "description": "Essential system packages (required)",
-        "packages": ["@core", "kernel", "grub2-efi-x64", "grub2-efi-x64-modules", "grub2-pc", "grub2-common", "grub2-tools", "shim-x64", "shim", "efibootmgr", "NetworkManager", "systemd-resolved", "flatpak", "xdg-desktop-portal", "xdg-desktop-portal-gtk"],
+        "packages": ("@core", "kernel", "grub2-efi-x64", "grub2-efi-x64-modules", "grub2-pc", "grub2-common", "grub2-tools", "shim-x64", "shim", "efibootmgr", "NetworkManager", "systemd-resolved", "flatpak", "xdg-desktop-portal", "xdg-desktop-portal-gtk"),
         "required": True,
         "selected": True
     },
     "desktop": {
         "name": "Additional Desktop Software",
         "description": "Extra desktop applications and utilities (desktop environment already included)",
-        "packages": ["gnome-tweaks", "gnome-extensions-app"],
+        "packages": ("gnome-tweaks", "gnome-extensions-app"),
         "required": False,
         "selected": False
     },
     "multimedia": {
         "name": "Multimedia Support",
         "description": "Audio, video, and graphics support",
-        "packages": ["@multimedia"],
+        "packages": ("@multimedia",),
         "required": False,
         "selected": True
     },
     "development": {
         "name": "Development Tools",
         "description": "Programming languages and development utilities",
-        "packages": ["gcc", "make", "git", "python3", "python3-pip", "nodejs", "npm"],
+        "packages": ("gcc", "make", "git", "python3", "python3-pip", "nodejs", "npm"),
         "required": False,
         "selected": False
     },
     "productivity": {
         "name": "Productivity Suite",
         "description": "Office applications and productivity tools",
-        "packages": ["thunderbird"],
-        "flatpak_packages": ["org.libreoffice.LibreOffice", "org.mozilla.firefox"],
+        "packages": ("thunderbird",),
+        "flatpak_packages": ("org.libreoffice.LibreOffice", "org.mozilla.firefox"),
         "required": False,
         "selected": True
     },
     "gaming": {
         "name": "Gaming Support",
         "description": "Steam and gaming-related packages",
-        "flatpak_packages": ["com.valvesoftware.Steam", "net.lutris.Lutris", "org.winehq.Wine"],
+        "flatpak_packages": ("com.valvesoftware.Steam", "net.lutris.Lutris", "org.winehq.Wine"),
         "required": False,
         "selected": False
     }
 }
 
-# Common custom repositories
+# Freeze the defaults (outer mapping and each group) so they cannot be mutated by accident
+DEFAULT_PACKAGE_GROUPS = MappingProxyType({gid: MappingProxyType(g) for gid, g in DEFAULT_PACKAGE_GROUPS.items()})
+
+# Position of each group in DEFAULT_PACKAGE_GROUPS, to keep package order stable
+_GROUP_ORDER = {gid: i for i, gid in enumerate(DEFAULT_PACKAGE_GROUPS)}
+# The fields package resolution reads, as parallel tuples indexed by _GROUP_ORDER
+# Names are interned: literals like "grub2-efi-x64" are not auto-interned, and dedup hashes them every time
+_GROUP_PACKAGES = tuple(tuple(map(sys.intern, g.get("packages", ()))) for g in DEFAULT_PACKAGE_GROUPS.values())
+_GROUP_FLATPAK = tuple(tuple(map(sys.intern, g.get("flatpak_packages", ()))) for g in DEFAULT_PACKAGE_GROUPS.values())
+_GROUP_REQUIRED = tuple(g["required"] for g in DEFAULT_PACKAGE_GROUPS.values())
+
+# Delay after the last keystroke before an entry row's text is parsed (ms)
+ENTRY_DEBOUNCE_MS = 250
+
+# Upper bound on packages parsed from the custom packages entry
+MAX_CUSTOM_PACKAGES = 256
+
+# Common custom repositories (read-only; per-page state lives in PayloadPage._repo_enabled)
 COMMON_REPOSITORIES = {
     "rpmfusion-free": {
         "name": "RPM Fusion Free",
@@ -69,6 +90,7 @@ COMMON_REPOSITORIES = {
         "enabled": False
     },
 }
+COMMON_REPOSITORIES = MappingProxyType({rid: MappingProxyType(r) for rid, r in COMMON_REPOSITORIES.items()})
 
 class PayloadPage(BaseConfigurationPage):
     """Enhanced page for package selection and software configuration."""
@@ -82,13 +104,31 @@ class PayloadPage(BaseConfigurationPage):
         )
         
         # State variables
-        self.package_groups = DEFAULT_PACKAGE_GROUPS.copy()
-        self.custom_repositories = COMMON_REPOSITORIES.copy()
+        # Mutable selection state, kept apart from the shared defaults
+        self._group_selected = {gid: g["selected"] for gid, g in DEFAULT_PACKAGE_GROUPS.items()}
+        self._repo_enabled = {rid: r["enabled"] for rid, r in COMMON_REPOSITORIES.items()}
+        # Groups whose packages get installed: selected or required
+        self._active_group_ids = {gid for gid, g in DEFAULT_PACKAGE_GROUPS.items() if g["selected"] or g["required"]}
         self.flatpak_enabled = True
         self.custom_packages = []
         self.oem_packages = []
         self.oem_repo_url = ""
-        
+        self._packages_cache = None # (dnf, flatpak) lists for the current selection, None when stale
+        self._group_rows = []
+        self.cache_row = None # Built lazily by _on_advanced_expanded
+        self._keep_cache = False # Mirrors cache_row, valid before it exists
+        self._oem_repo_timeout = 0 # Pending debounce sources for the entry rows
+        self._custom_pkg_timeout = 0
+        
+        # Widgets are only built once the page is first shown
+        self._ui_built = False
+        self.connect("map", self._on_first_map)
+
+    def _on_first_map(self, widget):
+        """Build the UI the first time the page is mapped."""
+        if self._ui_built:
+            return
+        self._ui_built = True
         self._build_ui()
         
     def _build_ui(self):
@@ -129,9 +169,9 @@ class PayloadPage(BaseConfigurationPage):
         
         self.flatpak_row = Adw.SwitchRow(
             title="Enable Flatpak Support",
-            subtitle="Install Flatpak and add Flathub repository"
+            subtitle="Install Flatpak and add Flathub repository",
+            active=self.flatpak_enabled
         )
-        self.flatpak_row.set_active(self.flatpak_enabled)
         self.flatpak_row.connect("notify::active", self.on_flatpak_toggled)
         self.flatpak_section.add(self.flatpak_row)
         
@@ -165,20 +205,15 @@ class PayloadPage(BaseConfigurationPage):
         self.custom_packages_row.connect("changed", self.on_custom_packages_changed)
         self.oem_section.add(self.custom_packages_row)
         
-        # Advanced Options (Expandable)
-        self.advanced_section = Adw.PreferencesGroup(
-            title="Advanced Options",
-            description="Expert configuration options"
-        )
+        # Advanced Options (Expandable; rows are built on first expand)
+        self.advanced_section = Adw.PreferencesGroup()
         self.add(self.advanced_section)
-        
-        # Package cache option
-        self.cache_row = Adw.SwitchRow(
-            title="Keep Package Cache",
-            subtitle="Preserve downloaded packages for faster reinstallation"
+        self.advanced_expander = Adw.ExpanderRow(
+            title="Advanced Options",
+            subtitle="Expert configuration options"
         )
-        self.cache_row.set_active(False)
-        self.advanced_section.add(self.cache_row)
+        self.advanced_expander.connect("notify::expanded", self._on_advanced_expanded)
+        self.advanced_section.add(self.advanced_expander)
         
         # Confirm button
         self.button_section = Adw.PreferencesGroup()
@@ -195,127 +230,169 @@ class PayloadPage(BaseConfigurationPage):
         confirm_row.add_suffix(self.complete_button)
         self.button_section.add(confirm_row)
         
+    def _on_advanced_expanded(self, expander, pspec):
+        """Build the advanced option rows the first time the expander opens."""
+        if self.cache_row is not None or not expander.get_expanded():
+            return
+        # Package cache option
+        self.cache_row = Adw.SwitchRow(
+            title="Keep Package Cache",
+            subtitle="Preserve downloaded packages for faster reinstallation",
+            active=self._keep_cache
+        )
+        self.cache_row.connect("notify::active", self.on_cache_toggled)
+        expander.add_row(self.cache_row)
+
+    def on_cache_toggled(self, switch_row, pspec):
+        """Handle package cache toggle."""
+        self._keep_cache = switch_row.get_active()
+        log.debug("Keep package cache %s", "enabled" if self._keep_cache else "disabled")
+
     def _populate_package_groups(self):
         """Populate the package groups section."""
-        for group_id, group_info in self.package_groups.items():
+        # Initial state goes through the constructor, so no notify::active fires before connect
+        self._group_rows = [] # (group_id, row) in display order
+        for group_id, group_info in DEFAULT_PACKAGE_GROUPS.items():
+            required = group_info["required"]
             row = Adw.SwitchRow(
                 title=group_info["name"],
-                subtitle=group_info["description"]
+                subtitle=group_info["description"] + (" (required)" if required else ""),
+                active=self._group_selected[group_id],
+                sensitive=not required
             )
-            
-            if group_info["required"]:
-                row.set_sensitive(False)
-                row.set_subtitle(group_info["description"] + " (required)")
-            
-            row.set_active(group_info["selected"])
-            row.connect("notify::active", self.on_group_toggled, group_id)
-            self.additional_section.add(row)
+            row.connect("notify::active", functools.partial(self._set_group_selected, group_id))
+            self._group_rows.append((group_id, row))
+        self._add_rows(self.additional_section, (row for _, row in self._group_rows))
             
     def _populate_repositories(self):
         """Populate the repositories section."""
-        for repo_id, repo_info in self.custom_repositories.items():
+        rows = []
+        for repo_id, repo_info in COMMON_REPOSITORIES.items():
             row = Adw.SwitchRow(
                 title=repo_info["name"],
-                subtitle=repo_info["description"]
+                subtitle=repo_info["description"],
+                active=self._repo_enabled[repo_id]
             )
-            row.set_active(repo_info["enabled"])
-            row.connect("notify::active", self.on_repo_toggled, repo_id)
-            self.repos_section.add(row)
+            row.connect("notify::active", functools.partial(self._set_repo_enabled, repo_id))
+            rows.append(row)
+        self._add_rows(self.repos_section, rows)
+
+    def _add_rows(self, group, rows):
+        """Attach prebuilt rows to a preferences group with its notifications batched."""
+        group.freeze_notify()
+        try:
+            for row in rows:
+                group.add(row)
+        finally:
+            group.thaw_notify()
             
-    def on_group_toggled(self, switch_row, pspec, group_id):
-        """Handle package group toggle."""
+    def _set_group_selected(self, group_id, switch_row, pspec):
+        """Handle package group toggle (group_id bound at connect time)."""
         is_active = switch_row.get_active()
-        if group_id in self.package_groups:
-            self.package_groups[group_id]["selected"] = is_active
-            print(f"Package group '{group_id}' {'enabled' if is_active else 'disabled'}")
+        self._group_selected[group_id] = is_active
+        if is_active:
+            self._active_group_ids.add(group_id)
+        elif not _GROUP_REQUIRED[_GROUP_ORDER[group_id]]:
+            self._active_group_ids.discard(group_id)
+        self._invalidate_packages()
+        log.debug("Package group '%s' %s", group_id, "enabled" if is_active else "disabled")
             
-    def on_repo_toggled(self, switch_row, pspec, repo_id):
-        """Handle repository toggle."""
+    def _set_repo_enabled(self, repo_id, switch_row, pspec):
+        """Handle repository toggle (repo_id bound at connect time)."""
         is_active = switch_row.get_active()
-        if repo_id in self.custom_repositories:
-            self.custom_repositories[repo_id]["enabled"] = is_active
-            print(f"Repository '{repo_id}' {'enabled' if is_active else 'disabled'}")
+        self._repo_enabled[repo_id] = is_active
+        log.debug("Repository '%s' %s", repo_id, "enabled" if is_active else "disabled")
             
     def on_flatpak_toggled(self, switch_row, pspec):
         """Handle Flatpak toggle."""
         self.flatpak_enabled = switch_row.get_active()
-        print(f"Flatpak support {'enabled' if self.flatpak_enabled else 'disabled'}")
+        log.debug("Flatpak support %s", "enabled" if self.flatpak_enabled else "disabled")
         
     def on_oem_repo_changed(self, entry_row):
-        """Handle custom repository URL change."""
+        """Handle custom repository URL change (committed after typing pauses)."""
+        if self._oem_repo_timeout:
+            GLib.source_remove(self._oem_repo_timeout)
+        self._oem_repo_timeout = GLib.timeout_add(ENTRY_DEBOUNCE_MS, self._commit_oem_repo, entry_row)
+
+    def _commit_oem_repo(self, entry_row):
+        """Store the custom repository URL once typing has paused."""
+        self._oem_repo_timeout = 0
         self.oem_repo_url = entry_row.get_text().strip()
-        print(f"Custom repository URL: {self.oem_repo_url}")
+        log.debug("Custom repository URL: %s", self.oem_repo_url)
+        return GLib.SOURCE_REMOVE
         
     def on_custom_packages_changed(self, entry_row):
-        """Handle custom packages list change."""
+        """Handle custom packages list change (parsed after typing pauses)."""
+        if self._custom_pkg_timeout:
+            GLib.source_remove(self._custom_pkg_timeout)
+        self._custom_pkg_timeout = GLib.timeout_add(ENTRY_DEBOUNCE_MS, self._commit_custom_packages, entry_row)
+
+    def _commit_custom_packages(self, entry_row):
+        """Parse the custom packages entry once typing has paused."""
+        self._custom_pkg_timeout = 0
         text = entry_row.get_text().strip()
-        self.custom_packages = [pkg.strip() for pkg in text.split() if pkg.strip()]
-        print(f"Custom packages: {self.custom_packages}")
+        # Bounded split: a huge paste costs at most MAX_CUSTOM_PACKAGES tokens of work
+        tokens = text.split(None, MAX_CUSTOM_PACKAGES)
+        if len(tokens) > MAX_CUSTOM_PACKAGES:
+            tokens.pop() # Unsplit remainder
+            self.show_toast(f"Too many packages, only the first {MAX_CUSTOM_PACKAGES} are used.")
+        self.custom_packages = list(dict.fromkeys(map(sys.intern, tokens)))
+        self._invalidate_packages()
+        log.debug("Custom packages: %s", self.custom_packages)
+        return GLib.SOURCE_REMOVE
+
+    def _flush_pending_entries(self):
+        """Commit entry edits still waiting on their debounce timeout."""
+        if self._oem_repo_timeout:
+            GLib.source_remove(self._oem_repo_timeout)
+            self._commit_oem_repo(self.oem_repo_row)
+        if self._custom_pkg_timeout:
+            GLib.source_remove(self._custom_pkg_timeout)
+            self._commit_custom_packages(self.custom_packages_row)
         
     def on_minimal_toggled(self, switch_row, pspec):
         """Handle minimal installation toggle."""
         is_minimal = switch_row.get_active()
         
-        # Disable group selections if minimal is enabled
-        for i in range(self.additional_section.get_row_at_index(0) is not None and 10 or 0):
-            row = self.additional_section.get_row_at_index(i)
-            if row and hasattr(row, 'set_sensitive'):
-                # Don't disable required groups
-                group_ids = list(self.package_groups.keys())
-                if i < len(group_ids):
-                    group_id = group_ids[i]
-                    if not self.package_groups[group_id]["required"]:
-                        row.set_sensitive(not is_minimal)
+        # Disable group selections if minimal is enabled (required groups stay as they are)
+        for group_id, row in self._group_rows:
+            if not DEFAULT_PACKAGE_GROUPS[group_id]["required"]:
+                row.set_sensitive(not is_minimal)
+        self._invalidate_packages()
         
-        print(f"Minimal installation {'enabled' if is_minimal else 'disabled'}")
+        log.debug("Minimal installation %s", "enabled" if is_minimal else "disabled")
         
+    def _invalidate_packages(self):
+        """Mark the cached package lists stale after a selection change."""
+        self._packages_cache = None
+
     def _get_selected_packages(self):
         """Get the complete list of DNF packages and flatpak packages to install."""
-        dnf_packages = []
-        flatpak_packages = []
-        
-        # Add packages from selected groups
-        for group_id, group_info in self.package_groups.items():
-            if group_info["selected"] or group_info["required"]:
-                dnf_packages.extend(group_info["packages"])
-                # Add flatpak packages if the group has them
-                if "flatpak_packages" in group_info:
-                    flatpak_packages.extend(group_info["flatpak_packages"])
-        
-        # Add custom packages (assume they are DNF packages)
-        dnf_packages.extend(self.custom_packages)
-        
-        # Add OEM packages if any (assume they are DNF packages)
-        dnf_packages.extend(self.oem_packages)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_dnf_packages = []
-        for pkg in dnf_packages:
-            if pkg not in seen:
-                seen.add(pkg)
-                unique_dnf_packages.append(pkg)
-                
-        seen = set()
-        unique_flatpak_packages = []
-        for pkg in flatpak_packages:
-            if pkg not in seen:
-                seen.add(pkg)
-                unique_flatpak_packages.append(pkg)
+        if self._packages_cache is not None:
+            return self._packages_cache
+        active = sorted(_GROUP_ORDER[group_id] for group_id in self._active_group_ids)
+        
+        # Group packages, then custom and OEM packages (assume they are DNF packages);
+        # dict.fromkeys drops duplicates in C while preserving first-seen order
+        unique_dnf_packages = list(dict.fromkeys(itertools.chain(
+            itertools.chain.from_iterable(_GROUP_PACKAGES[i] for i in active),
+            self.custom_packages,
+            self.oem_packages
+        )))
+        unique_flatpak_packages = list(dict.fromkeys(
+            itertools.chain.from_iterable(_GROUP_FLATPAK[i] for i in active)
+        ))
                 
-        return unique_dnf_packages, unique_flatpak_packages
+        self._packages_cache = (unique_dnf_packages, unique_flatpak_packages)
+        return self._packages_cache
         
     def _get_enabled_repositories(self):
         """Get the list of repositories to enable."""
-        enabled_repos = []
-        
-        for repo_id, repo_info in self.custom_repositories.items():
-            if repo_info["enabled"]:
-                enabled_repos.append({
-                    "id": repo_id,
-                    "name": repo_info["name"],
-                    "url": repo_info["url"]
-                })
+        enabled_repos = [
+            {"id": repo_id, "name": repo_info["name"], "url": repo_info["url"]}
+            for repo_id, repo_info in COMMON_REPOSITORIES.items()
+            if self._repo_enabled[repo_id]
+        ]
         
         # Add custom OEM repository if provided
         if self.oem_repo_url:
@@ -329,26 +406,28 @@ class PayloadPage(BaseConfigurationPage):
         
     def apply_settings_and_return(self, button):
         """Apply the software configuration and return to summary."""
-        print(f"--- Apply Software Settings START ---")
+        log.debug("--- Apply Software Settings START ---")
+        self._flush_pending_entries() # Don't lose the last keystrokes
         
         selected_packages, flatpak_packages = self._get_selected_packages()
         enabled_repos = self._get_enabled_repositories()
         
-        print(f"  Selected packages ({len(selected_packages)}): {selected_packages[:10]}{'...' if len(selected_packages) > 10 else ''}")
-        print(f"  Flatpak packages ({len(flatpak_packages)}): {flatpak_packages}")
-        print(f"  Enabled repositories: {[r['id'] for r in enabled_repos]}")
-        print(f"  Flatpak enabled: {self.flatpak_enabled}")
+        if log.isEnabledFor(logging.DEBUG): # Skip building the summaries otherwise
+            log.debug("  Selected packages (%d): %s%s", len(selected_packages), selected_packages[:10], "..." if len(selected_packages) > 10 else "")
+            log.debug("  Flatpak packages (%d): %s", len(flatpak_packages), flatpak_packages)
+            log.debug("  Enabled repositories: %s", [r["id"] for r in enabled_repos])
+            log.debug("  Flatpak enabled: %s", self.flatpak_enabled)
         
         # Build configuration data
         config_values = {
-            "package_groups": {gid: ginfo["selected"] for gid, ginfo in self.package_groups.items()},
+            "package_groups": dict(self._group_selected), # Copy: the page keeps mutating its own
             "packages": selected_packages,
             "flatpak_packages": flatpak_packages,
             "repositories": enabled_repos,
             "flatpak_enabled": self.flatpak_enabled,
             "custom_packages": self.custom_packages,
             "oem_repo_url": self.oem_repo_url,
-            "keep_cache": self.cache_row.get_active(),
+            "keep_cache": self._keep_cache,
             "use_live_copy": True  # Always use live copy
         }
         
@@ -368,5 +447,5 @@ class PayloadPage(BaseConfigurationPage):
         total_software = package_count + flatpak_count
         self.show_toast(f"Software plan: {total_software} additional packages ({package_count} DNF, {flatpak_count} Flatpak), {repo_count} repositories{feature_text}")
         
-        print("Software configuration confirmed. Returning to summary.")
+        log.info("Software configuration confirmed. Returning to summary.")
         super().mark_complete_and_return(button, config_values=config_values) 
\ No newline at end of file
@@ -1,19 +1,86 @@
 # centrio_installer/ui/progress.py
 
-import gi
 import subprocess # For command execution
 import os         # For creating directories
 import shlex      # For logging commands safely
 import threading  # For running install in background
 import time       # For small delays maybe
 import shutil     # For copying resolv.conf
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib
+import sys
+import queue      # For handing log records from the worker thread to the log listener
+import atexit
+import logging
+import logging.handlers
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor # For running independent unmounts concurrently
+from dataclasses import dataclass
+from gi.repository import Gtk, Adw, GLib, Gio
 
 # Import backend functions
 import backend
 
+# Progress redraw period while installing (~30 Hz)
+REFRESH_INTERVAL_MS = 33
+# Pulse period of the progress bar during backend calls that report no intermediate fractions
+PULSE_INTERVAL_MS = 100
+# Bounded poll for a partition node after udevadm settle (settle can return before the event is queued)
+PARTITION_NODE_WAIT = 5.0
+PARTITION_NODE_POLL = 0.1
+# Progress bar labels by integer percent, built once instead of per redraw
+_PCT = [f"{i}%" for i in range(101)]
+# Filesystem options for the vfat ESP (mount(2) data string; mount(8) gets "rw,relatime," prepended)
+VFAT_MOUNT_DATA = "fmask=0077,dmask=0077,codepage=437,iocharset=iso8859-1,shortname=mixed,errors=remount-ro"
+# Prefix of the lines the fused storage script echoes before each command ("STORAGE-STEP:i/N:name")
+STORAGE_PROGRESS_MARKER = "STORAGE-STEP:"
+# Upper bound on concurrent unmounts of pre-existing mounts on the target disk
+UNMOUNT_WORKERS = 4
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False # Written once by the listener below, in the same plain form as backend's print() output
+_log_listener = None
+
+def _start_log_listener():
+    """Routes this module's records through a QueueHandler to a QueueListener writing them to stdout (once).
+    The install worker only enqueues records; the listener thread does the writes.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    _log_listener.start()
+    atexit.register(_log_listener.stop) # Writes out whatever is still queued at exit
+
+@dataclass(frozen=True, slots=True)
+class InstallPlan:
+    """config_data decoded once before the install thread starts; steps read fields instead of chained .get()s."""
+    config: dict # Raw config_data, for backend helpers that take the whole dict
+    disk: dict
+    payload: dict
+    network: dict
+    user: dict
+    bootloader: dict
+    primary_disk: str
+    efi_partition: str
+
+    @classmethod
+    def from_config(cls, config_data):
+        disk = config_data.get('disk') or {}
+        efi_partition = next((p.get('device') for p in disk.get('partitions', []) if p.get('mountpoint') == '/boot/efi'), None)
+        return cls(
+            config=config_data,
+            disk=disk,
+            payload=config_data.get('payload') or {},
+            network=config_data.get('network') or {},
+            user=config_data.get('user'),
+            bootloader=config_data.get('bootloader') or {},
+            primary_disk=(disk.get('target_disks') or [None])[0],
+            efi_partition=efi_partition,
+        )
+
 class ProgressPage(Gtk.Box):
     def __init__(self, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=18, **kwargs)
@@ -44,89 +111,154 @@ class ProgressPage(Gtk.Box):
         self.installation_error = None # Store any fatal error message
         self.target_root = "/mnt/sysimage" # Define the target mount point
         self.main_window = None # Store main window reference
-        self.stop_requested = False # Flag to stop installation
+        self._cancellable = Gio.Cancellable() # Cancelled by stop_installation; also terminates the running storage script
         self.disk_config = None # Store disk_config for potential unmount later
+        self._pending_text = None # Latest values written by the worker thread
+        self._pending_fraction = None
+        self._drawn_text = None # Values currently shown, to skip redundant redraws
+        self._drawn_fraction = None
+        self._refresh_id = None # GLib timeout source redrawing progress while installing
+        self._pulse_id = None # GLib timeout source pulsing the bar during opaque backend calls
+        self._step_progress = self._update_progress_text # Backend progress callback for the running step, scaled to its span
+        _start_log_listener()
 
     def _update_progress_text(self, text, fraction=None):
-        """Helper to update progress bar text and optionally fraction via GLib.idle_add."""
-        def update():
-            # This code runs in the main GTK thread
+        """Helper to update progress bar text and optionally fraction; the GTK side redraws at REFRESH_INTERVAL_MS."""
+        # Log every update here, the refresher only sees the latest one
+        log.info("Progress Update: %s (Overall Fraction: %s)", text, "[text only]" if fraction is None else fraction)
+        # Plain attribute stores are atomic under the GIL, no lock needed
+        self._pending_text = text
+        if fraction is not None:
+            self._pending_fraction = fraction
+        if self._refresh_id is None:
+            GLib.idle_add(self._draw_pending, priority=GLib.PRIORITY_DEFAULT_IDLE) # No refresher running (before/after install), draw once
+
+    @property
+    def stop_requested(self):
+        """True once stop_installation has cancelled the current run."""
+        return self._cancellable.is_cancelled()
+
+    def _scaled_progress(self, start, end):
+        """Returns a progress callback mapping a sub-task's own 0..1 fraction into [start, end] of the overall bar."""
+        return functools.partial(self._report_scaled, start, end - start)
+
+    def _report_scaled(self, start, span, text, fraction=None):
+        """Target of the _scaled_progress partials: span is precomputed, no closure cells per step."""
+        self._update_progress_text(text, None if fraction is None else start + span * fraction)
+
+    def _draw_pending(self):
+        """Draws the latest pending progress values if they changed (runs in the main GTK thread)."""
+        text, fraction = self._pending_text, self._pending_fraction
+        if text is not None and text != self._drawn_text:
             self.progress_label.set_text(text)
-            if fraction is not None:
-                # Keep track of the latest known overall fraction
-                self.progress_value = max(self.progress_value, fraction) 
-                clamped_fraction = max(0.0, min(self.progress_value, 1.0))
-                self.progress_bar.set_fraction(clamped_fraction)
-                self.progress_bar.set_text(f"{int(clamped_fraction * 100)}%")
-            # Always log the text update
-            print(f"Progress Update: {text} (Overall Fraction: {fraction if fraction is not None else '[text only]' })") 
-        GLib.idle_add(update)
+            self._drawn_text = text
+        if fraction is not None and fraction != self._drawn_fraction and self._pulse_id is None:
+            # Keep track of the latest known overall fraction
+            self.progress_value = fraction
+            clamped_fraction = max(0.0, min(self.progress_value, 1.0))
+            self.progress_bar.set_fraction(clamped_fraction)
+            self.progress_bar.set_text(_PCT[int(clamped_fraction * 100)])
+            self._drawn_fraction = fraction
+        return GLib.SOURCE_REMOVE
+
+    def _refresh_ui(self):
+        """Periodic refresher installed by start_installation."""
+        self._draw_pending()
+        return GLib.SOURCE_CONTINUE
+
+    def _start_pulse(self):
+        """Switches the bar to pulse mode until _stop_pulse (callable from the worker thread)."""
+        def start():
+            if self._pulse_id is None:
+                self._pulse_id = GLib.timeout_add(PULSE_INTERVAL_MS, self._pulse_tick)
+            return GLib.SOURCE_REMOVE
+        GLib.idle_add(start)
+
+    def _pulse_tick(self):
+        self.progress_bar.pulse()
+        return GLib.SOURCE_CONTINUE
+
+    def _stop_pulse(self):
+        """Leaves pulse mode and redraws the latest fraction (callable from the worker thread)."""
+        def stop():
+            if self._pulse_id is not None:
+                GLib.source_remove(self._pulse_id)
+                self._pulse_id = None
+            self._drawn_fraction = None # Fraction updates were held back while pulsing
+            return self._draw_pending()
+        GLib.idle_add(stop)
+
+    def _stop_refresher(self):
+        """Removes the periodic refresher and draws whatever is still pending."""
+        if self._refresh_id is not None:
+            GLib.source_remove(self._refresh_id)
+            self._refresh_id = None
+        self._draw_pending()
 
     def _attempt_unmount(self):
         """Attempts to unmount filesystems mounted under target_root."""
-        print("Attempting to unmount target filesystems...")
-        # Get mounted filesystems under the target path
-        # Use findmnt to reliably get mount points in the correct order for unmounting (nested last)
+        log.info("Attempting to unmount target filesystems...")
+        # Get mounted filesystems under the target path from the kernel mount table
+        # Longest-first sort puts nested mount points before their parents for unmounting
         try:
-            # Ensure buffers are flushed before checking mounts
-            try: subprocess.run(["sync"], check=False, timeout=5) 
-            except Exception: pass
+            # Fast path: a lazy detach of target_root takes every filesystem mounted below it along in one syscall
+            detach_ok, detach_err = backend._umount_direct(self.target_root, backend.MNT_DETACH)
+            if detach_ok:
+                log.info(f"  Detached {self.target_root} and all mounts below it.")
+                return
+            # EINVAL: target_root itself isn't a mount point, but submounts (e.g. only /boot/efi) may still exist
+            log.info(f"  Recursive detach not possible ({detach_err}), unmounting individually...")
             
-            # -n: no header
-            # -r: raw output
-            # -o TARGET: only show target mount point
-            # --target: filter by target path
-            cmd = ["findmnt", "-nr", "-o", "TARGET", f"--target={self.target_root}"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=10)
-            mount_points = sorted([line.strip() for line in result.stdout.split('\n') if line.strip().startswith(self.target_root)], reverse=True)
+            root_prefix = self.target_root.rstrip("/") + "/"
+            mount_points = sorted({tgt for _src, tgt in backend._list_mounts() if tgt == self.target_root or tgt.startswith(root_prefix)}, key=len, reverse=True)
             
             if not mount_points:
-                print("  No filesystems found mounted under target root.")
+                log.info("  No filesystems found mounted under target root.")
                 return
 
-            print(f"  Will try to unmount: {mount_points}")
+            log.info(f"  Will try to unmount: {mount_points}")
+            # Don't try to unmount the root mount itself if it wasn't found explicitly
+            # (e.g., if only /mnt/sysimage/boot/efi was mounted)
+            has_root_partition = any(p.get("mountpoint") == "/" for p in (self.disk_config or {}).get("partitions", []))
             for mp in mount_points:
-                # Don't try to unmount the root mount itself if it wasn't found explicitly
-                # (e.g., if only /mnt/sysimage/boot/efi was mounted)
-                if mp == self.target_root and not any(p.get("mountpoint") == "/" for p in self.disk_config.get("partitions", [])):
+                if mp == self.target_root and not has_root_partition:
                      continue
                      
-                print(f"    Unmounting {mp}...")
+                log.info(f"    Unmounting {mp}...")
+                # umount2(2) directly: normal first, then lazy and forced (MNT_DETACH|MNT_FORCE)
+                direct_ok, direct_err = backend._umount_direct(mp)
+                if not direct_ok:
+                    log.info(f"      Warning: {direct_err}. Trying lazy unmount...")
+                    direct_ok, direct_err = backend._umount_direct(mp, backend.MNT_DETACH | backend.MNT_FORCE)
+                if direct_ok:
+                    log.info(f"      Successfully unmounted {mp}")
+                    continue
+                # Last resort (e.g. not running as root): umount(8)
+                log.info(f"      Warning: {direct_err}. Falling back to umount(8)...")
                 umount_cmd = ["umount", mp]
                 try:
-                    # Sync before trying to unmount
-                    try: subprocess.run(["sync"], check=False, timeout=5) 
-                    except Exception: pass
                     # Try normal unmount first
-                    subprocess.run(umount_cmd, check=True, timeout=15, capture_output=True)
-                    print(f"      Successfully unmounted {mp}")
+                    backend._stream_command(umount_cmd, timeout=15, line_callback=log.info, check=True)
+                    log.info(f"      Successfully unmounted {mp}")
                 except subprocess.CalledProcessError as e:
-                    print(f"      Warning: Failed to unmount {mp}: {e.stderr.strip()}. Trying lazy unmount...")
-                    # Sync again before lazy unmount
-                    try: subprocess.run(["sync"], check=False, timeout=5) 
-                    except Exception: pass
+                    log.info(f"      Warning: Failed to unmount {mp}: {e.stdout.strip()}. Trying lazy unmount...")
                     # Fallback to lazy unmount
                     umount_lazy_cmd = ["umount", "-l", mp]
                     try:
-                        subprocess.run(umount_lazy_cmd, check=True, timeout=5, capture_output=True)
-                        print(f"        Lazy unmount successful for {mp}")
+                        backend._stream_command(umount_lazy_cmd, timeout=5, line_callback=log.info, check=True)
+                        log.info(f"        Lazy unmount successful for {mp}")
                     except Exception as lazy_e:
-                        print(f"        Warning: Lazy unmount also failed for {mp}: {lazy_e}")
+                        log.info(f"        Warning: Lazy unmount also failed for {mp}: {lazy_e}")
                 except subprocess.TimeoutExpired:
-                     print(f"      Warning: Timeout unmounting {mp}")
+                     log.info(f"      Warning: Timeout unmounting {mp}")
                 except Exception as e:
-                     print(f"      Warning: Error unmounting {mp}: {e}")
+                     log.info(f"      Warning: Error unmounting {mp}: {e}")
                      
-            # Final sync after all attempts
-            try: subprocess.run(["sync"], check=False, timeout=5) 
-            except Exception: pass
+            # Final sync after all attempts: sync(2) directly, no sync(1) fork/exec
+            os.sync()
                     
-        except FileNotFoundError:
-            print("  Warning: 'findmnt' command not found. Cannot automatically unmount.")
-        except subprocess.CalledProcessError as e:
-            print(f"  Warning: 'findmnt' failed: {e.stderr.strip()}. Cannot automatically unmount.")
         except Exception as e:
-            print(f"  Warning: Error listing mounts: {e}. Cannot automatically unmount.")
+            log.info(f"  Warning: Error listing mounts: {e}. Cannot automatically unmount.")
 
     def _execute_storage_setup(self, disk_config):
         """Executes partitioning/formatting/mounting with support for enhanced disk options."""
@@ -139,7 +271,7 @@ class ProgressPage(Gtk.Box):
         dual_boot = disk_config.get("dual_boot", False)
         preserve_efi = disk_config.get("preserve_efi", False)
         
-        print(f"Storage setup: method={method}, filesystem={filesystem}, dual_boot={dual_boot}, preserve_efi={preserve_efi}")
+        log.info(f"Storage setup: method={method}, filesystem={filesystem}, dual_boot={dual_boot}, preserve_efi={preserve_efi}")
 
         # Handle new method names - map them to processing logic
         if method in ["normal", "dual_boot"]:
@@ -159,176 +291,147 @@ class ProgressPage(Gtk.Box):
             
             if dual_boot:
                 if preserve_efi:
-                    self._update_progress_text(f"Preparing disk {primary_disk} for dual boot installation...", 0.01)
+                    self._step_progress(f"Preparing disk {primary_disk} for dual boot installation...", 0.03)
                 else:
-                    self._update_progress_text(f"Preparing disk {primary_disk} for dual boot (new EFI)...", 0.01)
+                    self._step_progress(f"Preparing disk {primary_disk} for dual boot (new EFI)...", 0.03)
             else:
-                self._update_progress_text(f"Preparing disk {primary_disk} for clean installation...", 0.01)
+                self._step_progress(f"Preparing disk {primary_disk} for clean installation...", 0.03)
             
             # --- Stop udisks2 --- 
             stop_success, stop_err = backend._stop_service("udisks2.service")
             if not stop_success:
                  # Log warning but continue, maybe it wasn't running
-                 print(f"Warning: Failed to stop udisks2 service (continuing): {stop_err}")
+                 log.info(f"Warning: Failed to stop udisks2 service (continuing): {stop_err}")
             else:
-                 print("Stopped udisks2 service temporarily.")
-                 time.sleep(1) # Give it a moment
+                 log.info("Stopped udisks2 service temporarily.") # systemctl stop returns once it has exited
                  
             # --- Deactivate LVM --- 
             lvm_success, lvm_err = backend._deactivate_lvm_on_disk(primary_disk, self._update_progress_text)
             if not lvm_success:
                  # Log warning but proceed cautiously
-                 print(f"Warning: Failed to fully deactivate LVM on {primary_disk} (continuing): {lvm_err}")
+                 log.info(f"Warning: Failed to fully deactivate LVM on {primary_disk} (continuing): {lvm_err}")
             else:
-                 print(f"LVM deactivation check complete for {primary_disk}.")
+                 log.info(f"LVM deactivation check complete for {primary_disk}.")
                  
             # --- Pre-emptive Unmount --- 
             if dual_boot and preserve_efi:
-                self._update_progress_text(f"Checking mounts on {primary_disk} (preserving EFI)...", 0.02)
+                self._step_progress(f"Checking mounts on {primary_disk} (preserving EFI)...", 0.06)
             else:
-                self._update_progress_text(f"Checking existing mounts on {primary_disk}...", 0.02)
+                self._step_progress(f"Checking existing mounts on {primary_disk}...", 0.06)
                 
             mount_targets_to_check = set()
             device_paths_to_check = set([primary_disk])
             try:
-                # Get all related device paths (disk + partitions)
-                lsblk_cmd = ["lsblk", "-n", "-o", "PATH", "--raw", primary_disk]
-                print(f"  Running: {' '.join(lsblk_cmd)}")
-                lsblk_result = subprocess.run(lsblk_cmd, capture_output=True, text=True, check=False, timeout=10)
-                if lsblk_result.returncode == 0:
-                    found_paths = [line.strip() for line in lsblk_result.stdout.split('\n') if line.strip()]
-                    print(f"  lsblk identified potential device paths: {found_paths}")
-                    device_paths_to_check.update(found_paths)
-                else:
-                    print(f"  Warning: lsblk failed for {primary_disk} (rc={lsblk_result.returncode}), proceeding with just the base disk path.")
+                # Get all related device paths (disk + partitions) from sysfs, no lsblk fork/exec
+                found_paths = backend._list_disk_device_paths(primary_disk)
+                log.info(f"  sysfs identified potential device paths: {found_paths}")
+                device_paths_to_check.update(found_paths)
                 
-                # Check each device path for mounts using findmnt
-                print(f"  Checking for mounts on paths: {list(device_paths_to_check)}")
+                # One pass over the kernel mount table instead of a findmnt --source per device path
+                log.info(f"  Checking for mounts on paths: {list(device_paths_to_check)}")
+                src_to_targets = defaultdict(list)
+                for src, tgt in backend._list_mounts():
+                    src_to_targets[src].append(tgt)
                 for dev_path in device_paths_to_check:
-                    findmnt_cmd = ["findmnt", "-n", "-r", "-o", "TARGET", f"--source={dev_path}"]
-                    result = subprocess.run(findmnt_cmd, capture_output=True, text=True, check=False, timeout=10)
-                    if result.returncode == 0 and result.stdout.strip():
-                        mount_points = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-                        print(f"    findmnt identified mount points for source {dev_path}: {mount_points}")
+                    mount_points = src_to_targets.get(dev_path)
+                    if mount_points:
+                        log.info(f"    Mount table lists mount points for source {dev_path}: {mount_points}")
                         mount_targets_to_check.update(mount_points)
 
             except Exception as e:
-                print(f"Warning: lsblk failed, proceeding with only {primary_disk}")
+                log.info(f"Warning: device enumeration failed, proceeding with only {primary_disk}")
             
             try:
-                # Sync before checking lsof
-                try: subprocess.run(["sync"], check=False, timeout=5) 
-                except Exception: pass
-                # Check each mount point for active processes using lsof
-                print(f"Running lsof on paths: {list(mount_targets_to_check)} to check for busy resources...")
-                for path in sorted(list(mount_targets_to_check), reverse=True):
-                    print(f"  Checking lsof on {path}...")
-                    lsof_cmd = ["lsof", path]
-                    lsof_success, lsof_err, lsof_stdout = backend._run_command(lsof_cmd, f"Check Processes on {path}", timeout=15)
-                    
+                # Check all mount points for active processes with a single lsof run
+                lsof_paths = sorted(mount_targets_to_check, reverse=True)
+                if lsof_paths:
+                    log.info(f"Running lsof on paths: {lsof_paths} to check for busy resources...")
+                    lsof_success, lsof_err, lsof_stdout = backend._lsof_busy_check(lsof_paths, "Check Processes on mount points", timeout=15)
                     if lsof_stdout:
-                        err_msg_detail = f"Device path {path} is busy. Processes found by lsof:\n{lsof_stdout}"
-                        print(f"ERROR: {err_msg_detail}")
+                        err_msg_detail = f"Mount points {lsof_paths} are busy. Processes found by lsof:\n{lsof_stdout}"
+                        log.info(f"ERROR: {err_msg_detail}")
                         self.installation_error = err_msg_detail
                         return False # Fail immediately
                     elif not lsof_success and ("Cannot run program" in lsof_err or "Command not found" in lsof_err):
-                        print(f"  Warning: lsof command not found for check on {path}.")
-                    # else: lsof check passed for this path
+                        log.info(f"  Warning: lsof command not found for check on {lsof_paths}.")
+                    # else: lsof check passed for every path
 
             except Exception as e:
-                print(f"Warning: findmnt check failed: {e}")
+                log.info(f"Warning: findmnt check failed: {e}")
                 
             # --- Attempt Unmount --- 
             unmount_failed = False
             if mount_targets_to_check:
-                print(f"  Attempting to unmount: {sorted(list(mount_targets_to_check))}")
-                for path in sorted(list(mount_targets_to_check), reverse=True):
-                    print(f"    Unmounting {path}...")
-                    umount_cmd = ["umount", path]
-                    try:
-                        # Sync before unmount
-                        try: subprocess.run(["sync"], check=False, timeout=5) 
-                        except Exception: pass
-                        result = subprocess.run(umount_cmd, check=True, timeout=10, capture_output=True, text=True)
-                        print(f"      Successfully unmounted {path} (stdout: {result.stdout.strip()}, stderr: {result.stderr.strip()}) ")
-                        time.sleep(1) # Shorter sleep, sync is more important
-                    except subprocess.CalledProcessError as e:
-                        print(f"      Warning: Failed standard unmount {path} (rc={e.returncode}, stdout: {e.stdout.strip()}, stderr: {e.stderr.strip()}). Trying lazy unmount...")
-                        # Sync before lazy unmount
-                        try: subprocess.run(["sync"], check=False, timeout=5) 
-                        except Exception: pass
-                        umount_lazy_cmd = ["umount", "-l", path]
-                        try:
-                            result_lazy = subprocess.run(umount_lazy_cmd, check=True, timeout=10, capture_output=True, text=True)
-                            print(f"        Lazy unmount successful for {path} (stdout: {result_lazy.stdout.strip()}, stderr: {result_lazy.stderr.strip()}) ")
-                            time.sleep(1)
-                        except Exception as lazy_e:
-                            # Capture specific error for lazy unmount failure
-                            lazy_err_msg = f"Failed to unmount {path} even with lazy option: {lazy_e}"
-                            if isinstance(lazy_e, subprocess.CalledProcessError):
-                                lazy_err_msg += f" (rc={lazy_e.returncode}, stdout: {lazy_e.stdout.strip()}, stderr: {lazy_e.stderr.strip()})"
-                            print(f"      ERROR: {lazy_err_msg}")
-                            self.installation_error = lazy_err_msg
-                            unmount_failed = True
-                            break # Stop trying to unmount if one fails fatally
-                    except Exception as std_e:
-                        # Catch other errors during standard unmount
-                        std_err_msg = f"Error during standard unmount of {path}: {std_e}"
-                        print(f"      ERROR: {std_err_msg}")
-                        self.installation_error = std_err_msg
+                log.info(f"  Attempting to unmount: {sorted(list(mount_targets_to_check))}")
+                # A lazy+forced unmount detaches immediately, so no per-mount sync/sleep
+                # Independent mount points: unmount concurrently (a detached parent takes its children along)
+                umount_paths = sorted(mount_targets_to_check, reverse=True)
+                with ThreadPoolExecutor(max_workers=UNMOUNT_WORKERS) as ex:
+                    umount_errors = list(ex.map(self._try_umount_path, umount_paths))
+                for path, umount_err_msg in zip(umount_paths, umount_errors):
+                    if umount_err_msg:
+                        log.info(f"      ERROR: {umount_err_msg}")
+                        self.installation_error = umount_err_msg
                         unmount_failed = True
-                        break
+                        break # Report the first failure
             else:
-                print("  No active mount points identified to unmount.")
+                log.info("  No active mount points identified to unmount.")
                 
             # Add explicit unmount attempt on the base device itself
-            print(f"Attempting final unmount on base device {primary_disk}...")
+            log.info(f"Attempting final unmount on base device {primary_disk}...")
             try:
-                 # Sync before final base unmount
-                 try: subprocess.run(["sync"], check=False, timeout=5) 
-                 except Exception: pass
-                 subprocess.run(["umount", primary_disk], check=False, capture_output=True, text=True, timeout=10)
+                 # One flush once the unmounts are done (sync(2) directly, no sync(1) fork/exec)
+                 os.sync()
+                 # umount(8) of a device path unmounts wherever it is mounted: do that with umount2(2) from the mount table
+                 for src, tgt in backend._list_mounts():
+                     if src == primary_disk:
+                         base_ok, base_err = backend._umount_direct(tgt, backend.MNT_DETACH, missing_ok=True)
+                         if not base_ok:
+                             log.info(f"  Warning: {base_err}")
             except Exception as base_umount_e:
-                 print(f"  Warning: Error during final base device umount: {base_umount_e}")
+                 log.info(f"  Warning: Error during final base device umount: {base_umount_e}")
                  
             if unmount_failed: # Check result from loop above
                  return False
 
             # --- Reread Partitions, Remove DM, Settle, Sync --- 
-            print(f"Running partprobe on {primary_disk}...")
+            log.info(f"Running partprobe on {primary_disk}...")
             try:
                 partprobe_cmd = ["partprobe", primary_disk]
                 pp_success, pp_err, _ = backend._run_command(partprobe_cmd, f"Reread partitions on {primary_disk}", timeout=30)
-                if not pp_success: print(f"  Warning: partprobe failed: {pp_err}")
-                time.sleep(2) # Reduced pause after partprobe, rely on settle
-            except Exception as pp_e: print(f"Warning: Error running partprobe: {pp_e}")
+                if not pp_success: log.info(f"  Warning: partprobe failed: {pp_err}")
+            except Exception as pp_e: log.info(f"Warning: Error running partprobe: {pp_e}")
+            
+            # Flush buffers in the background while dmsetup and udev settle run; sync is independent of both
+            def run_sync():
+                try:
+                    os.sync()
+                    log.info("  Sync complete.")
+                except Exception as sync_e:
+                    log.info(f"Warning: Error running sync: {sync_e}")
+            log.info("Flushing buffers (sync)...")
+            sync_thread = threading.Thread(target=run_sync, daemon=True)
+            sync_thread.start()
             
             # Add dmsetup remove
             dm_success, dm_warn = backend._remove_dm_mappings(primary_disk, self._update_progress_text)
             if not dm_success: # Should always return True, but check anyway
-                 print(f"Warning: dmsetup removal step indicated failure (ignored): {dm_warn}")
-            if dm_warn: print(f"Note: {dm_warn}") # Print any warning message
-            time.sleep(1) # Pause after dmsetup
+                 log.info(f"Warning: dmsetup removal step indicated failure (ignored): {dm_warn}")
+            if dm_warn: log.info(f"Note: {dm_warn}") # Print any warning message
                  
-            print("Running udevadm settle...")
+            # settle waits for the udev events queued by partprobe/dmsetup, no fixed pauses needed
+            log.info("Running udevadm settle...")
             try:
                 # Run directly, might not need pkexec depending on context
                 subprocess.run(["udevadm", "settle"], check=False, timeout=60) # Increased timeout
-                print("  Udev settle complete.")
+                log.info("  Udev settle complete.")
             except FileNotFoundError:
-                 print("Warning: udevadm not found, cannot settle udev queue.")
+                 log.info("Warning: udevadm not found, cannot settle udev queue.")
             except Exception as settle_e:
-                 print(f"Warning: Error running udevadm settle: {settle_e}")
-                 
-            print("Running sync command to flush buffers...")
-            try:
-                subprocess.run(["sync"], check=False, timeout=15)
-                print("  Sync complete.")
-                time.sleep(1) # Small pause after sync
-            except Exception as sync_e:
-                 print(f"Warning: Error running sync: {sync_e}")
+                 log.info(f"Warning: Error running udevadm settle: {settle_e}")
+            sync_thread.join(15)
 
-            self._update_progress_text("Disk checks complete.", 0.04)
+            self._step_progress("Disk checks complete.", 0.12)
 
         # --- Execute Main Storage Actions ---
         if automatic_mode:
@@ -336,69 +439,66 @@ class ProgressPage(Gtk.Box):
                 self.installation_error = "Automatic partitioning selected, but no commands were generated."
                 return False
                 
-            self._update_progress_text("Preparing storage devices...", 0.05)
+            self._step_progress("Preparing storage devices...", 0.15)
             
-            for i, cmd_list in enumerate(commands):
-                cmd_name = cmd_list[0]
-                progress_fraction = 0.1 + (0.20 * (i / len(commands))) # Adjusted fraction range
+            # --- Final LSOF Check + Delay JUST before wipefs (run ahead of the storage script below) --- 
+            cmd_name = "wipefs"
+            if primary_disk and any(c[0] == cmd_name and primary_disk in c for c in commands):
+                log.info(f"--- Performing FINAL check before {cmd_name} on {primary_disk} ---")
+                lsof_found_processes = False
+                # Get device paths again (from sysfs) in case partprobe changed them
+                final_device_paths_to_lsof = sorted(set(backend._list_disk_device_paths(primary_disk)))
                 
-                # --- Final LSOF Check + Delay JUST before wipefs --- 
-                if cmd_name == "wipefs" and primary_disk and primary_disk in cmd_list:
-                    print(f"--- Performing FINAL check before {cmd_name} on {primary_disk} ---")
-                    lsof_found_processes = False
-                    # Get device paths again in case partprobe changed them
-                    final_device_paths_to_lsof = set([primary_disk])
-                    try:
-                        lsblk_cmd = ["lsblk", "-n", "-o", "PATH", "--raw", primary_disk]
-                        lsblk_result = subprocess.run(lsblk_cmd, capture_output=True, text=True, check=False, timeout=10)
-                        if lsblk_result.returncode == 0:
-                            final_device_paths_to_lsof.update([line.strip() for line in lsblk_result.stdout.split('\n') if line.strip()])
-                    except Exception: pass # Ignore lsblk failure here
+                log.info(f"Running final lsof on paths: {final_device_paths_to_lsof}...")
+                lsof_success, lsof_err, lsof_stdout = backend._lsof_busy_check(final_device_paths_to_lsof, f"Final Check on {primary_disk}", timeout=15)
+                if lsof_stdout:
+                    err_msg_detail = f"FINAL CHECK FAILED: A device path of {primary_disk} is busy:\n{lsof_stdout}"
+                    log.info(f"ERROR: {err_msg_detail}")
+                    self.installation_error = err_msg_detail
+                    return False # Fail immediately
+                elif not lsof_success and ("Cannot run program" in lsof_err or "Command not found" in lsof_err):
+                    log.info(f"  Warning: lsof command not found for final check on {primary_disk}.")
+                # else: lsof check passed for every path
                     
-                    print(f"Running final lsof on paths: {list(final_device_paths_to_lsof)}...")
-                    # Sync before final lsof
-                    try: subprocess.run(["sync"], check=False, timeout=5) 
-                    except Exception: pass
-                    for dev_path in final_device_paths_to_lsof:
-                        lsof_cmd = ["lsof", dev_path]
-                        lsof_success, lsof_err, lsof_stdout = backend._run_command(lsof_cmd, f"Final Check on {dev_path}", timeout=15)
-                        if lsof_stdout:
-                            err_msg_detail = f"FINAL CHECK FAILED: Path {dev_path} is busy:\n{lsof_stdout}"
-                            print(f"ERROR: {err_msg_detail}")
-                            self.installation_error = err_msg_detail
-                            return False # Fail immediately
-                        elif not lsof_success and ("Cannot run program" in lsof_err or "Command not found" in lsof_err):
-                            print(f"  Warning: lsof command not found for final check on {dev_path}.")
-                        # else: lsof check passed for this path
-                        
-                    if not lsof_found_processes: # Should always be False if we got here
-                         print(f"  Final lsof checks passed for all paths.")
-                         print(f"Adding 8 second delay before executing {cmd_name}...") # Increased delay
-                         try: subprocess.run(["sync"], check=False, timeout=5) # Sync before delay
-                         except Exception: pass
-                         time.sleep(8) # Increased from 5 to 8 seconds
-                         try: subprocess.run(["sync"], check=False, timeout=5) # Sync after delay
-                         except Exception: pass
-                    else:
-                         # This case should not be reached due to return above
-                         return False 
-                
-                # --- Execute command --- 
-                quoted_cmd = ' '.join(shlex.quote(c) for c in cmd_list)
-                print(f"--- ABOUT TO EXECUTE STORAGE COMMAND: {quoted_cmd} ---")
-                
-                self._update_progress_text(f"Running: {cmd_name}...", progress_fraction)
-                success, err, _ = backend._run_command(cmd_list, f"Storage Step: {cmd_name}", self._update_progress_text, timeout=120) # Increased timeout for mkfs/parted
-                if not success:
-                    self.installation_error = err
-                    # Should we restart udisks2 here on failure?
-                    # backend._start_service("udisks2.service") # Maybe add this?
-                    return False
+                if not lsof_found_processes: # Should always be False if we got here
+                     log.info(f"  Final lsof checks passed for all paths.")
+                     log.info(f"Waiting for udev to settle before executing {cmd_name}...")
+                     os.sync()
+                     # Returns as soon as the udev queue is empty instead of a fixed delay
+                     try: subprocess.run(["udevadm", "settle", "--timeout=10"], check=False, timeout=12)
+                     except Exception as settle_e: log.info(f"  Warning: udevadm settle failed: {settle_e}")
+                else:
+                     # This case should not be reached due to return above
+                     return False 
+            
+            # --- Execute all commands as one script: a single privilege escalation instead of one per command --- 
+            script_lines = ["set -e"]
+            total = len(commands)
+            for i, cmd_list in enumerate(commands):
+                if i > 0 and cmd_list[0].startswith("mkfs") and not commands[i - 1][0].startswith("mkfs"):
+                    # Partition nodes from parted must exist before formatting
+                    script_lines.append("udevadm settle --timeout=30 || true")
+                script_lines.append(f"echo {shlex.quote(f'{STORAGE_PROGRESS_MARKER}{i + 1}/{total}:{cmd_list[0]}')}")
+                script_lines.append(' '.join(shlex.quote(c) for c in cmd_list))
+            script = "\n".join(script_lines)
+            log.info(f"--- ABOUT TO EXECUTE STORAGE SCRIPT ---\n{script}")
+            
+            self._step_progress(f"Running {total} storage commands...", 0.3)
+            success, err, stdout = backend._run_command(["/bin/sh", "-c", script], "Storage Setup", self._update_progress_text, timeout=120 * total, cancellable=self._cancellable)
+            # The last marker printed names the command that was running when the script stopped
+            markers = [line[len(STORAGE_PROGRESS_MARKER):] for line in (stdout or "").splitlines() if line.startswith(STORAGE_PROGRESS_MARKER)]
+            if not success:
+                if markers:
+                    err = f"Storage step {markers[-1]} failed: {err}"
+                self.installation_error = err
+                # Should we restart udisks2 here on failure?
+                # backend._start_service("udisks2.service") # Maybe add this?
+                return False
                     
-            self._update_progress_text("Partitioning and formatting complete.", 0.30) # End fraction adjusted
+            self._step_progress("Partitioning and formatting complete.", 0.8)
             
             # --- Verify partitions were created successfully ---
-            self._update_progress_text("Verifying partition creation...", 0.31)
+            self._step_progress("Verifying partition creation...", 0.82)
             for part_info in partitions:
                 device = part_info.get("device")
                 mountpoint = part_info.get("mountpoint", "unknown")
@@ -406,19 +506,21 @@ class ProgressPage(Gtk.Box):
                 if not device:
                     continue
                     
-                print(f"Verifying partition: {device} (for {mountpoint})")
+                log.info(f"Verifying partition: {device} (for {mountpoint})")
                 
-                # Check if partition device exists
-                max_wait_time = 10  # seconds
-                wait_time = 0
-                while not os.path.exists(device) and wait_time < max_wait_time:
-                    print(f"  Waiting for partition {device} to appear...")
-                    time.sleep(1)
-                    wait_time += 1
+                # Check if partition device exists; if not, wait for udev to create the node instead of polling
+                if not os.path.exists(device):
+                    log.info(f"  Waiting for partition {device} to appear...")
+                    backend._udev_settle(timeout=10)
+                    deadline = time.monotonic() + PARTITION_NODE_WAIT
+                    while not os.path.exists(device) and time.monotonic() < deadline:
+                        time.sleep(PARTITION_NODE_POLL)
+                    if not os.path.exists(device):
+                        log.info(f"  Partition {device} still missing {PARTITION_NODE_WAIT:.0f}s after udev settle.")
                 
                 if not os.path.exists(device):
                     err_msg = f"Partition {device} was not created after partitioning commands"
-                    print(f"ERROR: {err_msg}")
+                    log.info(f"ERROR: {err_msg}")
                     self.installation_error = err_msg
                     return False
                 
@@ -428,22 +530,22 @@ class ProgressPage(Gtk.Box):
                     import stat
                     if not stat.S_ISBLK(stat_result.st_mode):
                         err_msg = f"Created partition {device} is not a block device"
-                        print(f"ERROR: {err_msg}")
+                        log.info(f"ERROR: {err_msg}")
                         self.installation_error = err_msg
                         return False
                 except Exception as e:
                     err_msg = f"Could not verify partition {device}: {e}"
-                    print(f"ERROR: {err_msg}")
+                    log.info(f"ERROR: {err_msg}")
                     self.installation_error = err_msg
                     return False
                 
-                print(f"  Partition {device} verified successfully")
+                log.info(f"  Partition {device} verified successfully")
             
-            print("All partitions verified successfully")
+            log.info("All partitions verified successfully")
             
         elif not automatic_mode:
-            print("Manual partitioning selected. Skipping wipefs/parted/mkfs commands.")
-            self._update_progress_text("Using existing partitions...", 0.25)
+            log.info("Manual partitioning selected. Skipping wipefs/parted/mkfs commands.")
+            self._step_progress("Using existing partitions...", 0.8)
             # Partitions should have been detected by DiskPage and passed in disk_config
             if not partitions:
                  self.installation_error = "Manual partitioning selected, but no partitions were detected or passed."
@@ -457,76 +559,91 @@ class ProgressPage(Gtk.Box):
             self.installation_error = f"No partition details found in config for {method} method, cannot mount."
             return False
             
-        self._update_progress_text("Mounting filesystems...", 0.3)
+        self._step_progress("Mounting filesystems...", 0.85)
         
         # Debug: Show what partitions we're trying to mount
-        print("=== PARTITION MOUNT DEBUG ===")
-        print(f"Target root: {self.target_root}")
-        print(f"Partitions to mount: {len(partitions)}")
+        log.info("=== PARTITION MOUNT DEBUG ===")
+        log.info(f"Target root: {self.target_root}")
+        log.info(f"Partitions to mount: {len(partitions)}")
         for i, part in enumerate(partitions):
-            print(f"  Partition {i+1}: device={part.get('device')}, mountpoint={part.get('mountpoint')}, fstype={part.get('fstype')}")
-        print("=== END PARTITION MOUNT DEBUG ===")
+            log.info(f"  Partition {i+1}: device={part.get('device')}, mountpoint={part.get('mountpoint')}, fstype={part.get('fstype')}")
+        log.info("=== END PARTITION MOUNT DEBUG ===")
         
         try:
-            os.makedirs(self.target_root, exist_ok=True)
+            # Usually only the leaf (or nothing) is missing: one mkdir, makedirs' per-component walk only if needed
+            try:
+                os.mkdir(self.target_root)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                os.makedirs(self.target_root, exist_ok=True)
         except OSError as e:
             self.installation_error = f"Failed to create root mount point {self.target_root}: {e}"
             return False
             
-        mount_progress_start = 0.3
-        mount_progress_end = 0.35
+        mount_progress_start = 0.85 # Mounting is the last part of the storage step
+        mount_progress_end = 1.0
         
-        # Corrected sort order: Mount / first, then others like /boot/efi
-        # Assign lower number to / mountpoint for sorting
-        sorted_partitions = sorted(partitions, key=lambda p: 0 if p.get("mountpoint") == "/" else (1 if p.get("mountpoint") == "/boot/efi" else 2))
+        # Corrected order: Mount / first, then /boot/efi, then the rest (input order kept within each bucket)
+        # Mount plan: (device, mountpoint, fstype, part_info), each field read from the dict once
+        root_plan, efi_plan, rest_plan = [], [], []
+        for p in partitions:
+            mp = p.get("mountpoint")
+            (root_plan if mp == "/" else efi_plan if mp == "/boot/efi" else rest_plan).append((p.get("device"), mp, p.get("fstype"), p))
+        mount_plan = root_plan + efi_plan + rest_plan
         
-        print(f"Mount order determined: {[p.get('mountpoint') for p in sorted_partitions]}")
+        log.info(f"Mount order determined: {[mountpoint for _, mountpoint, _, _ in mount_plan]}")
+        mount_dirs_created = False
+        # Current mounts by target (later entries overmount earlier ones), to skip partitions that are already in place
+        current_mounts = {tgt: src for src, tgt in backend._list_mounts()}
         
-        for i, part_info in enumerate(sorted_partitions):
-            device = part_info.get("device")
-            mountpoint = part_info.get("mountpoint")
-            fstype = part_info.get("fstype") # Get fstype for potential mount options
+        for i, (device, mountpoint, fstype, part_info) in enumerate(mount_plan):
             if not device or not mountpoint:
-                 print(f"Skipping partition due to missing device or mountpoint: {part_info}")
+                 log.info(f"Skipping partition due to missing device or mountpoint: {part_info}")
                  continue
                  
-            full_mount_path = os.path.join(self.target_root, mountpoint.lstrip('/'))
-            progress_fraction = mount_progress_start + (mount_progress_end - mount_progress_start) * (i / len(sorted_partitions))
+            full_mount_path = os.path.normpath(os.path.join(self.target_root, mountpoint.lstrip('/'))) # normpath: "/" must not become ".../sysimage/"
+            progress_fraction = mount_progress_start + (mount_progress_end - mount_progress_start) * (i / len(mount_plan))
             
-            # Create mount point directory *before* attempting mount
-            self._update_progress_text(f"Creating mount point {full_mount_path}...", progress_fraction)
-            try:
-                 # Only create if it's not the root mountpoint itself (which already exists)
-                 if full_mount_path != self.target_root:
-                     os.makedirs(full_mount_path, exist_ok=True)
-            except OSError as e:
-                 err_msg = f"Failed to create mount point {full_mount_path}: {e}"
-                 print(f"ERROR: {err_msg}")
-                 self.installation_error = err_msg
-                 self._attempt_unmount() # Cleanup previously mounted
-                 return False
+            # Create all non-root mount point directories in one pass, *after* / is mounted so they land on it
+            if full_mount_path != self.target_root and not mount_dirs_created:
+                 self._step_progress("Creating mount points...", progress_fraction)
+                 mount_dirs_created = True
+                 try:
+                      self._create_mount_dirs(partitions)
+                 except OSError as e:
+                      err_msg = f"Failed to create mount points under {self.target_root}: {e}"
+                      log.info(f"ERROR: {err_msg}")
+                      self.installation_error = err_msg
+                      self._attempt_unmount() # Cleanup previously mounted
+                      return False
+
+            # Already mounted here (e.g. installer re-run after a failure): mount(8) would only fail or stack a second mount
+            if current_mounts.get(full_mount_path) in (device, os.path.realpath(device)):
+                 log.info(f"{device} is already mounted at {full_mount_path}, skipping mount.")
+                 continue
 
             # Build mount command (add options if needed, e.g., for vfat)
             if fstype == "vfat":
                  # Add common options for FAT filesystems like EFI
-                 mount_cmd = ["mount", "-o", "rw,relatime,fmask=0077,dmask=0077,codepage=437,iocharset=iso8859-1,shortname=mixed,errors=remount-ro", device, full_mount_path]
+                 mount_cmd = ["mount", "-o", f"rw,relatime,{VFAT_MOUNT_DATA}", device, full_mount_path]
             else:
                  mount_cmd = ["mount", device, full_mount_path]
                  
             mount_desc = f"Mount {device} ({fstype}) -> {full_mount_path}"
-            self._update_progress_text(mount_desc + "...", progress_fraction + 0.01)
-            print(f"Running on host: {mount_desc} -> {' '.join(shlex.quote(c) for c in mount_cmd)}")
+            self._step_progress(mount_desc + "...", progress_fraction + 0.03)
+            log.info("Running on host: %s -> %r", mount_desc, mount_cmd)
             
             # Add verification before mounting, especially for EFI partitions
             if mountpoint == "/boot/efi":
-                print(f"=== EFI Partition Mount Verification ===")
-                print(f"Device: {device}")
-                print(f"Mount point: {full_mount_path}")
+                log.info(f"=== EFI Partition Mount Verification ===")
+                log.info(f"Device: {device}")
+                log.info(f"Mount point: {full_mount_path}")
                 
                 # Check if device exists
                 if not os.path.exists(device):
                     err_msg = f"EFI partition device does not exist: {device}"
-                    print(f"ERROR: {err_msg}")
+                    log.info(f"ERROR: {err_msg}")
                     self.installation_error = err_msg
                     self._attempt_unmount()
                     return False
@@ -537,13 +654,13 @@ class ProgressPage(Gtk.Box):
                     import stat
                     if not stat.S_ISBLK(stat_result.st_mode):
                         err_msg = f"EFI partition device is not a block device: {device}"
-                        print(f"ERROR: {err_msg}")
+                        log.info(f"ERROR: {err_msg}")
                         self.installation_error = err_msg
                         self._attempt_unmount()
                         return False
                 except Exception as e:
                     err_msg = f"Could not stat EFI partition device {device}: {e}"
-                    print(f"ERROR: {err_msg}")
+                    log.info(f"ERROR: {err_msg}")
                     self.installation_error = err_msg
                     self._attempt_unmount()
                     return False
@@ -551,148 +668,199 @@ class ProgressPage(Gtk.Box):
                 # Use blkid to verify filesystem type
                 try:
                     blkid_cmd = ["blkid", "-o", "value", "-s", "TYPE", device]
-                    blkid_result = subprocess.run(blkid_cmd, capture_output=True, text=True, check=False, timeout=10)
-                    detected_fstype = blkid_result.stdout.strip()
-                    print(f"Detected filesystem type: '{detected_fstype}'")
+                    blkid_result = subprocess.run(blkid_cmd, capture_output=True, check=False, timeout=10)
+                    detected_fstype = blkid_result.stdout.decode("utf-8", "replace").strip()
+                    log.info(f"Detected filesystem type: '{detected_fstype}'")
                     
                     if blkid_result.returncode == 0:
                         if detected_fstype != "vfat":
-                            print(f"WARNING: Expected vfat filesystem, found '{detected_fstype}'")
+                            log.info(f"WARNING: Expected vfat filesystem, found '{detected_fstype}'")
                     else:
-                        print(f"WARNING: blkid failed to detect filesystem type (rc={blkid_result.returncode})")
-                        print(f"  stderr: {blkid_result.stderr.strip()}")
+                        log.info(f"WARNING: blkid failed to detect filesystem type (rc={blkid_result.returncode})")
+                        log.info(f"  stderr: {blkid_result.stderr.decode('utf-8', 'replace').strip()}")
                 except Exception as e:
-                    print(f"WARNING: Could not verify filesystem type with blkid: {e}")
+                    log.info(f"WARNING: Could not verify filesystem type with blkid: {e}")
                 
-                # Add a small delay to ensure partition table is settled
-                print("Adding delay to ensure partition is ready...")
-                time.sleep(2)
+                # Wait for udev to finish processing the freshly formatted partition (no-op when the queue is empty)
+                log.info("Waiting for udev to settle so the partition is ready...")
+                backend._udev_settle(timeout=10)
                 
-                print(f"=== End EFI Partition Verification ===")
+                log.info(f"=== End EFI Partition Verification ===")
             
             try:
-                 # Use subprocess.run directly as we are already root
-                 result = subprocess.run(mount_cmd, capture_output=True, text=True, check=True, timeout=30)
-                 print(f"  Mount successful. stdout: {result.stdout.strip()}, stderr: {result.stderr.strip()}")
-                 
-                 # Verify the mount was successful by checking if it's actually mounted
-                 try:
-                     mount_check_cmd = ["findmnt", full_mount_path]
-                     mount_check_result = subprocess.run(mount_check_cmd, capture_output=True, text=True, check=False, timeout=5)
-                     if mount_check_result.returncode == 0:
-                         print(f"  Mount verification successful: {mount_check_result.stdout.strip()}")
+                 # Known fstype: call mount(2) directly, we are root and the options are fixed (kernel defaults otherwise)
+                 direct_ok = False
+                 if fstype and fstype != "swap":
+                     mount_flags, mount_data = (backend.MS_RELATIME, VFAT_MOUNT_DATA) if fstype == "vfat" else (0, None)
+                     direct_ok, direct_err = backend._mount_direct(device, full_mount_path, fstype, mount_flags, mount_data)
+                     if direct_ok:
+                         log.info("  Mount successful (mount(2)).")
                      else:
-                         print(f"  WARNING: Mount verification failed, but mount command succeeded")
-                 except Exception as e:
-                     print(f"  WARNING: Could not verify mount: {e}")
+                         log.info(f"  Warning: {direct_err}. Falling back to mount(8).")
+                 if not direct_ok:
+                     # Run directly as we are already root, streaming mount's output into the progress label
+                     result = backend._stream_command(mount_cmd, timeout=30, line_callback=self._update_progress_text, check=True)
+                     log.info(f"  Mount successful. output: {result.stdout.strip()}")
+                 
+                 # Verify the mount was successful by checking the kernel mount table (no findmnt spawn)
+                 mounted_sources = [src for src, tgt in backend._list_mounts() if tgt == full_mount_path]
+                 if mounted_sources:
+                     log.info(f"  Mount verification successful: {full_mount_path} <- {mounted_sources[-1]}")
+                 else:
+                     log.info(f"  WARNING: Mount verification failed, but mount command succeeded")
                      
             except subprocess.CalledProcessError as e:
-                 err_msg = f"Failed to mount {device} to {full_mount_path} (rc={e.returncode}): {e.stderr.strip() or e.stdout.strip()}"
-                 print(f"ERROR: {err_msg}")
+                 err_msg = f"Failed to mount {device} to {full_mount_path} (rc={e.returncode}): {e.stdout.strip()}"
+                 log.info(f"ERROR: {err_msg}")
                  
                  # Add additional debugging for EFI mount failures
                  if mountpoint == "/boot/efi":
-                     print("=== Additional EFI Mount Debugging ===")
+                     log.info("=== Additional EFI Mount Debugging ===")
                      try:
                          # Check if the device exists after mount failure
                          lsblk_cmd = ["lsblk", device]
-                         lsblk_result = subprocess.run(lsblk_cmd, capture_output=True, text=True, check=False, timeout=10)
-                         print(f"lsblk output for {device}:")
-                         print(f"  stdout: {lsblk_result.stdout}")
-                         print(f"  stderr: {lsblk_result.stderr}")
-                         print(f"  returncode: {lsblk_result.returncode}")
+                         lsblk_result = backend._stream_command(lsblk_cmd, timeout=10)
+                         log.info(f"lsblk output for {device}:")
+                         log.info(f"  output: {lsblk_result.stdout}")
+                         log.info(f"  returncode: {lsblk_result.returncode}")
                      except Exception as debug_e:
-                         print(f"Could not run lsblk for debugging: {debug_e}")
-                     print("=== End Additional EFI Mount Debugging ===")
+                         log.info(f"Could not run lsblk for debugging: {debug_e}")
+                     log.info("=== End Additional EFI Mount Debugging ===")
                  
                  self.installation_error = err_msg
                  self._attempt_unmount() # Cleanup previously mounted
                  return False
             except FileNotFoundError:
                  err_msg = "Mount command failed: 'mount' executable not found."
-                 print(f"ERROR: {err_msg}")
+                 log.info(f"ERROR: {err_msg}")
                  self.installation_error = err_msg
                  self._attempt_unmount()
                  return False
             except Exception as e:
                  # Catch other potential errors like timeouts
                  err_msg = f"Unexpected error mounting {device}: {e}"
-                 print(f"ERROR: {err_msg}")
+                 log.info(f"ERROR: {err_msg}")
                  self.installation_error = err_msg
                  self._attempt_unmount()
                  return False
 
-        self._update_progress_text("Filesystems mounted successfully.", mount_progress_end)
+        self._step_progress("Filesystems mounted successfully.", mount_progress_end)
         return True
 
+    def _try_umount_path(self, path):
+        """Lazily force-unmounts one pre-existing mount point. Returns an error message, or None on success."""
+        log.info(f"    Unmounting {path}...")
+        # EINVAL = not a mount point anymore (a parent's detach already took it); no ismount() stat pair
+        direct_ok, direct_err = backend._umount_direct(path, backend.MNT_DETACH | backend.MNT_FORCE, missing_ok=True)
+        if direct_ok:
+            log.info(f"      Successfully unmounted {path} (umount2)")
+            return None
+        log.info(f"      Warning: {direct_err}. Falling back to umount(8)...")
+        umount_cmd = ["umount", "-l", "-f", path]
+        try:
+            result = backend._stream_command(umount_cmd, timeout=10, line_callback=self._update_progress_text, check=True)
+            log.info(f"      Successfully unmounted {path} (output: {result.stdout.strip()}) ")
+            return None
+        except Exception as umount_e:
+            # Capture specific error for the unmount failure
+            umount_err_msg = f"Failed to unmount {path}: {umount_e}"
+            if isinstance(umount_e, subprocess.CalledProcessError):
+                umount_err_msg += f" (rc={umount_e.returncode}, output: {umount_e.stdout.strip()})"
+            return umount_err_msg
+
+    def _create_mount_dirs(self, partitions):
+        """Creates every mount point (and intermediate parent) under target_root in a single sorted walk."""
+        dirs = set()
+        for part in partitions:
+            mountpoint = (part.get("mountpoint") or "").strip("/")
+            if not mountpoint:
+                continue
+            # Collect each path prefix so os.mkdir never needs to create parents itself
+            parts = mountpoint.split("/")
+            for depth in range(1, len(parts) + 1):
+                dirs.add(os.path.join(self.target_root, *parts[:depth]))
+        for path in sorted(dirs): # Sorted order puts parents before children
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
+
     # --- Backend Execution Methods --- 
 
-    def _configure_system(self, config_data):
+    def _configure_system(self, plan):
         """Configures system settings using backend function."""
         if self.stop_requested: return False, "Stop requested"
-        self._update_progress_text("Configuring system settings...", 0.4)
+        self._step_progress("Configuring system settings...", 0.0)
         
-        success, err = backend.configure_system_in_container(
-            self.target_root, 
-            config_data, 
-            progress_callback=self._update_progress_text
-        )
+        self._start_pulse()
+        try:
+            success, err = backend.configure_system_in_container(
+                self.target_root, 
+                plan.config, 
+                progress_callback=self._step_progress
+            )
+        finally:
+            self._stop_pulse()
         
         if success:
-            self._update_progress_text("System settings configured.", 0.45)
+            self._step_progress("System settings configured.", 1.0)
         else:
             self.installation_error = err
             
         return success
 
-    def _create_user(self, config_data):
+    def _create_user(self, plan):
         """Creates user account using backend function."""
         if self.stop_requested: return False, "Stop requested"
-        user_config = config_data.get('user')
+        user_config = plan.user
         if not user_config or not user_config.get('username'):
-            print("Skipping user creation (no user configured).")
-            self._update_progress_text("User creation skipped.", 0.5)
+            log.info("Skipping user creation (no user configured).")
+            self._step_progress("User creation skipped.", 1.0)
             return True # Not an error to skip
             
         # TODO: Retrieve password securely if needed
         # For now, assume it might be missing or needs to be handled
         if 'password' not in user_config:
-             print("Warning: Password missing for user creation, attempting without.")
+             log.info("Warning: Password missing for user creation, attempting without.")
              # Or set a default, or fail?
              # Forcing failure for safety now
              self.installation_error = "Password missing in configuration for user creation."
              return False
              
         username = user_config['username']
-        self._update_progress_text(f"Creating user {username}...", 0.5)
+        self._step_progress(f"Creating user {username}...", 0.0)
         
-        success, err = backend.create_user_in_container(
-            self.target_root, 
-            user_config, 
-            progress_callback=self._update_progress_text
-        )
+        self._start_pulse()
+        try:
+            success, err = backend.create_user_in_container(
+                self.target_root, 
+                user_config, 
+                progress_callback=self._step_progress
+            )
+        finally:
+            self._stop_pulse()
         
         if success:
-            self._update_progress_text(f"User {username} created.", 0.55)
+            self._step_progress(f"User {username} created.", 1.0)
         else:
             self.installation_error = err
 
         return success
 
-    def _copy_live_environment(self, config_data):
+    def _copy_live_environment(self, plan):
         """Copies the entire live environment to the target disk instead of installing packages."""
         if self.stop_requested: return False, "Stop requested"
         
-        payload_config = config_data.get('payload', {})
-        network_config = config_data.get('network', {})
+        payload_config = plan.payload
+        network_config = plan.network
         
-        print("Using live environment copy method...")
+        log.info("Using live environment copy method...")
         self._update_progress_text("Starting live environment copy (This is much faster than package installation)...", 0.35)
         
         # Step 1: Copy the live environment
         success, err = backend.copy_live_environment(
             self.target_root,
-            progress_callback=self._update_progress_text
+            progress_callback=self._scaled_progress(0.35, 0.65)
         )
         
         if not success:
@@ -700,10 +868,10 @@ class ProgressPage(Gtk.Box):
             return False
         
         # Step 2: Setup the copied environment
-        self._update_progress_text("Setting up copied environment...", 0.75)
+        self._update_progress_text("Setting up copied environment...", 0.65)
         success, err = backend.setup_live_environment_post_copy(
             self.target_root,
-            progress_callback=self._update_progress_text
+            progress_callback=self._scaled_progress(0.65, 0.67)
         )
         
         if not success:
@@ -714,19 +882,19 @@ class ProgressPage(Gtk.Box):
         network_enabled = network_config.get('network_enabled', False)
         skip_network = network_config.get('skip_network', False)
         
-        print(f"Network configuration check:")
-        print(f"  network_enabled: {network_enabled}")
-        print(f"  skip_network: {skip_network}")
-        print(f"  network_config: {network_config}")
+        log.info(f"Network configuration check:")
+        log.info(f"  network_enabled: {network_enabled}")
+        log.info(f"  skip_network: {skip_network}")
+        log.info(f"  network_config: {network_config}")
         
         if skip_network:
-            self._update_progress_text("Network configuration skipped - only base system installed.", 0.85)
-            print("Network configuration skipped - no additional packages will be installed")
+            self._update_progress_text("Network configuration skipped - only base system installed.", 0.75)
+            log.info("Network configuration skipped - no additional packages will be installed")
             return True
         
         if not network_enabled:
-            self._update_progress_text("Network disabled - only base system installed.", 0.85)
-            print("Network disabled - no additional packages will be installed")
+            self._update_progress_text("Network disabled - only base system installed.", 0.75)
+            log.info("Network disabled - no additional packages will be installed")
             return True
         
         # Network is enabled, proceed with additional packages
@@ -735,20 +903,20 @@ class ProgressPage(Gtk.Box):
         flatpak_enabled = payload_config.get('flatpak_enabled', False)
         flatpak_packages = payload_config.get('flatpak_packages', [])
         
-        print(f"Additional packages check:")
-        print(f"  packages: {packages}")
-        print(f"  repositories: {repositories}")
-        print(f"  flatpak_enabled: {flatpak_enabled}")
-        print(f"  flatpak_packages: {flatpak_packages}")
+        log.info(f"Additional packages check:")
+        log.info(f"  packages: {packages}")
+        log.info(f"  repositories: {repositories}")
+        log.info(f"  flatpak_enabled: {flatpak_enabled}")
+        log.info(f"  flatpak_packages: {flatpak_packages}")
         
         # Double-check: if network is disabled, don't install any packages
         if not network_enabled or skip_network:
-            self._update_progress_text("Network disabled - only base system installed.", 0.85)
-            print("Network disabled - no additional packages will be installed (double-check)")
+            self._update_progress_text("Network disabled - only base system installed.", 0.75)
+            log.info("Network disabled - no additional packages will be installed (double-check)")
             return True
         
         if packages or repositories or flatpak_enabled:
-            self._update_progress_text("Installing additional packages on live environment...", 0.8)
+            self._update_progress_text("Installing additional packages on live environment...", 0.67)
             
             # Build package configuration for additional packages
             package_config = {
@@ -760,27 +928,32 @@ class ProgressPage(Gtk.Box):
                 "keep_cache": True
             }
             
-            success, err = backend.install_packages_on_live_copy(
-                self.target_root,
-                package_config,
-                progress_callback=self._update_progress_text
-            )
+            # dnf reports nothing between "Installing additional packages" and Flatpak: pulse meanwhile
+            self._start_pulse()
+            try:
+                success, err = backend.install_packages_on_live_copy(
+                    self.target_root,
+                    package_config,
+                    progress_callback=self._scaled_progress(0.67, 0.75)
+                )
+            finally:
+                self._stop_pulse()
             
             if not success:
                 self.installation_error = err
                 return False
         else:
-            self._update_progress_text("No additional packages selected - base system only.", 0.85)
-            print("No additional packages selected - base system only")
+            self._update_progress_text("No additional packages selected - base system only.", 0.75)
+            log.info("No additional packages selected - base system only")
         
-        self._update_progress_text("Live environment copy and setup complete.", 0.85)
+        self._update_progress_text("Live environment copy and setup complete.", 0.75)
         return True
 
-    def _install_packages(self, config_data):
+    def _install_packages(self, plan):
         """Installs packages using enhanced backend function with full configuration support."""
         if self.stop_requested: return False, "Stop requested"
         
-        payload_config = config_data.get('payload', {})
+        payload_config = plan.payload
         
         # Build package configuration for enhanced installer
         package_config = {
@@ -793,20 +966,24 @@ class ProgressPage(Gtk.Box):
         }
         
         # Log the configuration for debugging
-        print(f"Package installation config: {len(package_config['packages'])} packages, "
-              f"{len(package_config['repositories'])} repos, "
-              f"Flatpak: {package_config['flatpak_enabled']}, "
-              f"Minimal: {package_config['minimal_install']}")
+        log.info(f"Package installation config: {len(package_config['packages'])} packages, "
+                  f"{len(package_config['repositories'])} repos, "
+                  f"Flatpak: {package_config['flatpak_enabled']}, "
+                  f"Minimal: {package_config['minimal_install']}")
              
         # Add message here before calling backend
-        self._update_progress_text("Starting enhanced package installation (This may take a while)...", 0.35) 
+        self._step_progress("Starting enhanced package installation (This may take a while)...", 0.0)
         
         # Call enhanced backend function with full configuration
-        success, err = backend.install_packages_enhanced(
-            self.target_root,
-            package_config,
-            progress_callback=self._update_progress_text 
-        )
+        self._start_pulse()
+        try:
+            success, err = backend.install_packages_enhanced(
+                self.target_root,
+                package_config,
+                progress_callback=self._step_progress 
+            )
+        finally:
+            self._stop_pulse()
         
         # Note: Progress fractions inside install_packages_enhanced range from 0.0 to 1.0,
         # mapped to the overall progress range 0.35 -> 0.8 in _run_installation_steps scaling below.
@@ -821,19 +998,19 @@ class ProgressPage(Gtk.Box):
                 features.append(f"{len(package_config['custom_packages'])} custom packages")
             
             feature_text = f" with {', '.join(features)}" if features else ""
-            self._update_progress_text(f"Installed {package_count} packages{feature_text}.", 0.8)
+            self._step_progress(f"Installed {package_count} packages{feature_text}.", 1.0)
         else:
              self.installation_error = err
              
         return success
 
-    def _enable_network_manager_step(self, config_data):
+    def _enable_network_manager_step(self, plan):
         """Step wrapper for enabling NetworkManager."""
         if self.stop_requested: return False, "Stop requested"
         # No initial message needed, backend function sends one
         success, warning = backend.enable_network_manager(
              self.target_root, 
-             progress_callback=self._update_progress_text
+             progress_callback=self._step_progress
         )
         # Success is always True unless a fatal error occurred in _run_command
         # A warning is not considered a failure for this step
@@ -842,40 +1019,35 @@ class ProgressPage(Gtk.Box):
              return False 
         return True 
 
-    def _generate_fstab(self, config_data):
+    def _generate_fstab(self, plan):
         """Generate /etc/fstab in the target root after copying the system."""
         if self.stop_requested: return False, "Stop requested"
-        self._update_progress_text("Generating fstab...", 0.75)
+        self._step_progress("Generating fstab...", 0.0)
         try:
             success, err = backend.generate_fstab_for_target(self.target_root)
             if not success:
                 # Not fatal, but warn and continue
-                print(f"Warning: fstab generation issue: {err}")
+                log.info(f"Warning: fstab generation issue: {err}")
             return True
         except Exception as e:
-            print(f"Warning: fstab generation raised exception: {e}")
+            log.info(f"Warning: fstab generation raised exception: {e}")
             return True
 
-    def _install_bootloader(self, config_data):
+    def _install_bootloader(self, plan):
         """Installs bootloader using backend function."""
         if self.stop_requested: return False, "Stop requested"
-        bootloader_config = config_data.get('bootloader', {})
-        disk_config = config_data.get('disk', {})
+        bootloader_config = plan.bootloader
         
         if not bootloader_config.get('install_bootloader', False):
-            print("Skipping bootloader installation.")
-            self._update_progress_text("Bootloader installation skipped.", 0.9)
+            log.info("Skipping bootloader installation.")
+            self._step_progress("Bootloader installation skipped.", 1.0)
             return True
 
-        # Determine primary disk and EFI partition (if exists)
-        primary_disk = disk_config.get('target_disks', [None])[0]
-        efi_partition_device = None
-        partitions = disk_config.get('partitions', [])
-        for part in partitions:
-            if part.get('mountpoint') == '/boot/efi':
-                efi_partition_device = part.get('device')
-                print(f"Found EFI partition device: {efi_partition_device}")
-                break
+        # Primary disk and EFI partition (if exists) were resolved once in InstallPlan.from_config
+        primary_disk = plan.primary_disk
+        efi_partition_device = plan.efi_partition
+        if efi_partition_device:
+            log.info(f"Found EFI partition device: {efi_partition_device}")
         
         if not primary_disk:
              self.installation_error = "Cannot determine target disk for bootloader installation."
@@ -883,17 +1055,21 @@ class ProgressPage(Gtk.Box):
         # Note: We might proceed even without an EFI partition found here, 
         # backend function will handle BIOS vs UEFI logic.
 
-        self._update_progress_text("Installing bootloader...", 0.9)
+        self._step_progress("Installing bootloader...", 0.0)
         
-        success, err, _ = backend.install_bootloader_in_container(
-            self.target_root, 
-            primary_disk, 
-            efi_partition_device, # Pass EFI partition device
-            progress_callback=self._update_progress_text
-        )
+        self._start_pulse()
+        try:
+            success, err, _ = backend.install_bootloader_in_container(
+                self.target_root, 
+                primary_disk, 
+                efi_partition_device, # Pass EFI partition device
+                progress_callback=self._step_progress
+            )
+        finally:
+            self._stop_pulse()
         
         if success:
-            self._update_progress_text("Bootloader installed.", 0.95)
+            self._step_progress("Bootloader installed.", 1.0)
             # Clean up EFI mount after successful bootloader installation
             backend.cleanup_efi_mount(self.target_root)
         else:
@@ -906,43 +1082,64 @@ class ProgressPage(Gtk.Box):
     def start_installation(self, main_window, config_data):
         """Start the actual installation process sequentially."""
         self.main_window = main_window # Store ref for navigation
-        self.stop_requested = False # Reset stop flag
-        print("Starting installation with config:", config_data)
+        self._cancellable = Gio.Cancellable() # Fresh cancellable per run (a cancelled one can't be reused)
+        log.info("Starting installation with config: %s", config_data)
         self.progress_value = 0.0
         self.installation_error = None 
         self.progress_bar.set_fraction(0.0)
         self.progress_label.set_text("Preparing installation...")
+        self._pending_text = self._pending_fraction = None
+        self._drawn_text = self._drawn_fraction = None
+        if self._refresh_id is None:
+            self._refresh_id = GLib.timeout_add(REFRESH_INTERVAL_MS, self._refresh_ui)
         
         # Run installation steps in a separate thread to avoid blocking UI
         # Use GLib.idle_add to update UI from the thread
-        thread = threading.Thread(target=self._run_installation_steps, args=(config_data,))
+        thread = threading.Thread(target=self._run_installation_steps, args=(InstallPlan.from_config(config_data),))
         thread.daemon = True # Allow app to exit even if thread hangs
         thread.start()
 
-    def _run_installation_steps(self, config_data):
+    def _run_installation_steps(self, plan):
         """Worker function to run installation steps sequentially."""
-        steps = [ 
+        steps = ( 
              # Updated fractions slightly 
-             (self._execute_storage_setup,      config_data.get('disk', {}), 0.00,  0.30), # 30%
-             (self._copy_live_environment,      config_data,             0.30,  0.75), # 45%
-             (self._generate_fstab,             config_data,             0.75,  0.75), # Ensure fstab exists
-             (self._debug_find_shim,            config_data,             0.75,  0.75), # Debug step
-             (self._configure_system,           config_data,             0.75,  0.80), # 5%
-             (self._create_user,                config_data,             0.80,  0.85), # 5%
-             (self._enable_network_manager_step,config_data,             0.85,  0.87), # 2%
-             (self._install_bootloader,         config_data,             0.87,  0.97), # 10%
+             (self._execute_storage_setup,      plan.disk,               0.00,  0.30), # 30%
+             (self._copy_live_environment,      plan,                    0.30,  0.75), # 45%
+             (self._generate_fstab,             plan,                    0.75,  0.75), # Ensure fstab exists
+             (self._debug_find_shim,            plan,                    0.75,  0.75), # Debug step
+             (self._configure_system,           plan,                    0.75,  0.80), # 5%
+             (self._create_user,                plan,                    0.80,  0.85), # 5%
+             (self._enable_network_manager_step,plan,                    0.85,  0.87), # 2%
+             (self._install_bootloader,         plan,                    0.87,  0.97), # 10%
              # Post-install?                                               0.97,  1.00  # 3%
-        ]
+        )
         
         final_success = True
+        background_steps = [] # Read-only diagnostic steps running alongside the main sequence
+        # One privilege prompt for the whole install instead of one per backend command (no-op when already root)
+        backend.start_root_runner()
         try:
             # Main step loop
             for func, data, start_fraction, end_fraction in steps:
                 if self.stop_requested:
-                    print("Installation stopped by user request.")
+                    log.info("Installation stopped by user request.")
                     final_success = False
                     break
                 
+                if func == self._debug_find_shim:
+                    # Full-tree find over target_root, nothing depends on it: overlap it with the following steps
+                    background_thread = threading.Thread(target=func, args=(data,), daemon=True)
+                    background_thread.start()
+                    background_steps.append(background_thread)
+                    continue
+
+                if func == self._configure_system:
+                    # fstab is written: from here on every chroot step shares one set of API mounts
+                    session_ok, session_err = backend.open_chroot_session(self.target_root)
+                    if not session_ok:
+                        log.info(f"Warning: {session_err}. Chroot mounts will be set up per command.")
+
+                self._step_progress = self._scaled_progress(start_fraction, end_fraction)
                 step_success = func(data) 
                 
                 # --- Add explicit /etc check+create after package install ---
@@ -953,27 +1150,27 @@ class ProgressPage(Gtk.Box):
                     
                     # Ensure /etc exists
                     if not os.path.exists(etc_path):
-                        print(f"Warning: {etc_path} not found after package install. Creating it...")
+                        log.info(f"Warning: {etc_path} not found after package install. Creating it...")
                         try:
                             os.makedirs(etc_path, exist_ok=True)
-                            print(f"Successfully created {etc_path}.")
+                            log.info(f"Successfully created {etc_path}.")
                         except OSError as e:
-                            print(f"ERROR: Failed to create {etc_path}: {e}")
+                            log.info(f"ERROR: Failed to create {etc_path}: {e}")
                             self.installation_error = f"Failed to create essential directory {etc_path}: {e}"
                             step_success = False # Mark step as failed
                     
                     # Copy host resolv.conf if /etc creation succeeded
                     if step_success and os.path.exists(host_resolv_conf):
-                        print(f"Copying {host_resolv_conf} to {resolv_conf_target}...")
+                        log.info(f"Copying {host_resolv_conf} to {resolv_conf_target}...")
                         try:
                             shutil.copy2(host_resolv_conf, resolv_conf_target)
-                            print(f"Successfully copied resolv.conf.")
+                            log.info(f"Successfully copied resolv.conf.")
                         except Exception as copy_e:
                             # Log warning but don't necessarily fail the whole install?
                             # Chroot might still work for some things without network.
-                            print(f"Warning: Failed to copy {host_resolv_conf} to {resolv_conf_target}: {copy_e}")
+                            log.info(f"Warning: Failed to copy {host_resolv_conf} to {resolv_conf_target}: {copy_e}")
                     elif step_success and not os.path.exists(host_resolv_conf):
-                         print(f"Warning: Host {host_resolv_conf} not found. Cannot copy to target.")
+                         log.info(f"Warning: Host {host_resolv_conf} not found. Cannot copy to target.")
                          
                 # ---------------------------------------------------------
                 
@@ -981,16 +1178,20 @@ class ProgressPage(Gtk.Box):
                     final_success = False
                     if not self.installation_error:
                          self.installation_error = f"Step {func.__name__} failed without error message."
-                    self._update_progress_text(self.installation_error, start_fraction)
+                    self._update_progress_text(self.installation_error) # Bar stays where the step stopped
                     break
                 else:
                      final_step_message = f"Step {func.__name__} complete."
                      self._update_progress_text(final_step_message, end_fraction)
         
         finally:
+             for background_thread in background_steps:
+                 background_thread.join(35) # find has a 30 s timeout of its own
+             backend.close_chroot_session(self.target_root)
              # --- Ensure udisks2 is restarted --- 
-             print("Installation sequence finished or stopped. Ensuring udisks2 service is started...")
+             log.info("Installation sequence finished or stopped. Ensuring udisks2 service is started...")
              backend._start_service("udisks2.service")
+             backend.stop_root_runner()
         
         # --- Finalize UI --- 
         def finalize_ui():
@@ -1005,37 +1206,41 @@ class ProgressPage(Gtk.Box):
                 error_msg = f"Installation failed: {self.installation_error}"
                 self._update_progress_text(error_msg, self.progress_bar.get_fraction())
                 self._attempt_unmount() 
+            self._stop_refresher()
         
         GLib.idle_add(finalize_ui)
 
     def stop_installation(self):
         """Signals the installation thread to stop and attempts unmount."""
-        print("Stop installation requested.")
+        log.info("Stop installation requested.")
         if not self.stop_requested: # Prevent multiple calls
-            self.stop_requested = True
+            self._cancellable.cancel()
             # Attempt unmount immediately after stop request
             # This might race with the thread, but better than nothing?
             # Consider signaling the thread to cleanup instead.
             # For now, just call it here.
             self._attempt_unmount()
 
-    def _debug_find_shim(self, config_data):
+    def _debug_find_shim(self, plan):
         """Debug step to locate shimx64.efi after DNF install."""
-        print("--- DEBUG: Searching for shimx64.efi in target root --- ")
-        find_cmd = ["find", self.target_root, "-name", "shimx64.efi"]
+        log.info("--- DEBUG: Searching for shimx64.efi in target root --- ")
+        # Runs while open_chroot_session binds the host's API filesystems under target_root: don't walk them
+        proc_dir, sys_dir, dev_dir = (os.path.join(self.target_root, name) for name in ("proc", "sys", "dev"))
+        find_cmd = ["find", self.target_root, "(", "-path", proc_dir, "-o", "-path", sys_dir, "-o", "-path", dev_dir, ")",
+                    "-prune", "-o", "-name", "shimx64.efi", "-print"]
         try:
             # Run directly, doesn't need root if target_root is accessible
             result = subprocess.run(find_cmd, capture_output=True, text=True, check=False, timeout=30)
-            print(f"  Command: {' '.join(shlex.quote(c) for c in find_cmd)}")
-            print(f"  Exit Code: {result.returncode}")
-            print(f"  Stdout:\n{result.stdout.strip()}")
+            log.info(f"  Command: {' '.join(shlex.quote(c) for c in find_cmd)}")
+            log.info(f"  Exit Code: {result.returncode}")
+            log.info(f"  Stdout:\n{result.stdout.strip()}")
             if result.stderr:
-                print(f"  Stderr:\n{result.stderr.strip()}")
+                log.info(f"  Stderr:\n{result.stderr.strip()}")
             if not result.stdout.strip():
-                 print("  shimx64.efi NOT FOUND by find command.")
+                 log.info("  shimx64.efi NOT FOUND by find command.")
             else:
-                 print("  shimx64.efi FOUND by find command.")
+                 log.info("  shimx64.efi FOUND by find command.")
         except Exception as e:
-            print(f"  ERROR running find command: {e}")
-        print("--- DEBUG: End search for shimx64.efi --- ")
+            log.info(f"  ERROR running find command: {e}")
+        log.info("--- DEBUG: End search for shimx64.efi --- ")
         return True # Always succeed, this is just for debugging
\ No newline at end of file
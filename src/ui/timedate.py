@@ -1,11 +1,10 @@
 # centrio_installer/ui/timedate.py
 
-import gi
 import subprocess # For timedatectl
 import re         # For parsing timedatectl output
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw
+import os         # For reading /etc/localtime
+import threading  # For fetching status off the GTK thread
+from gi.repository import Gtk, Adw, GLib
 
 from .base import BaseConfigurationPage
 # Use ana_get_all_regions_and_timezones from utils
@@ -70,74 +69,96 @@ class TimeDatePage(BaseConfigurationPage):
         print(f"NTP toggled to: {self.current_ntp}")
 
     def connect_and_fetch_data(self):
-        """Fetches current timezone and NTP status using timedatectl."""
+        """Fetches current timezone and NTP status using timedatectl, off the GTK thread."""
+        # /etc/localtime points into zoneinfo; reading it is instant, timedatectl may wait on timedated
+        try:
+            localtime = os.readlink("/etc/localtime")
+            if "zoneinfo/" in localtime:
+                self.current_timezone = localtime.split("zoneinfo/", 1)[1]
+                self._select_current_timezone()
+        except OSError:
+            pass
         print("Fetching time settings using timedatectl...")
+        threading.Thread(target=self._fetch_timedatectl_status, daemon=True).start()
+
+    def _fetch_timedatectl_status(self):
+        """Worker thread: runs timedatectl status and hands the outcome to the main loop."""
         try:
             cmd = ["timedatectl", "status"]
             result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
-            output = result.stdout
-            print(f"timedatectl status output:\n{output}")
-
-            # Parse Timezone
-            tz_match = re.search(r"Time zone: ([^ ]+)", output)
-            if tz_match:
-                self.current_timezone = tz_match.group(1)
-                print(f"  Found Timezone: {self.current_timezone}")
-            else:
-                print("  Could not parse timezone from timedatectl output.")
-                # Keep default self.current_timezone = "UTC"
-
-            # Parse NTP status
-            ntp_match = re.search(r"NTP service: (\w+)", output)
-            if ntp_match:
-                self.current_ntp = (ntp_match.group(1) == "active")
-                print(f"  Found NTP status: {self.current_ntp}")
-            else:
-                 # Older versions might use "Network time on: yes/no"
-                 ntp_match_alt = re.search(r"Network time on: (yes|no)", output)
-                 if ntp_match_alt:
-                      self.current_ntp = (ntp_match_alt.group(1) == "yes")
-                      print(f"  Found Network time status: {self.current_ntp}")
-                 else:
-                      print("  Could not parse NTP status from timedatectl output.")
-                      # Keep default self.current_ntp = False
-
-            # Update UI based on fetched values
-            # Set Timezone Combo
-            if self.current_timezone in self.timezone_list:
-                try:
-                    idx = self.timezone_list.index(self.current_timezone)
-                    self.timezone_row.set_selected(idx)
-                except ValueError:
-                    print(f"Warning: Fetched timezone '{self.current_timezone}' not in list.")
-                    if self.timezone_list: self.timezone_row.set_selected(0)
-            elif self.timezone_list:
-                self.timezone_row.set_selected(0) # Default to first if fetch failed/not found
-                
-            # Set NTP Switch
-            self.ntp_row.set_active(self.current_ntp)
-            
-            # Ensure widgets are sensitive
-            self.timezone_row.set_sensitive(bool(self.timezone_list))
-            self.ntp_row.set_sensitive(True)
-            self.complete_button.set_sensitive(bool(self.timezone_list))
+            GLib.idle_add(self._apply_timedatectl_status, result.stdout, None)
+        except Exception as e:
+            GLib.idle_add(self._apply_timedatectl_status, None, e)
 
-        except FileNotFoundError:
+    def _select_current_timezone(self):
+        """Selects self.current_timezone in the timezone combo (first entry if unknown)."""
+        if self.current_timezone in self.timezone_list:
+            self.timezone_row.set_selected(self.timezone_list.index(self.current_timezone))
+        elif self.timezone_list:
+            print(f"Warning: Fetched timezone '{self.current_timezone}' not in list.")
+            self.timezone_row.set_selected(0) # Default to first if fetch failed/not found
+
+    def _apply_timedatectl_status(self, output, error):
+        """Parses timedatectl status output (or reports its failure) and updates the widgets."""
+        if isinstance(error, FileNotFoundError):
             print("ERROR: timedatectl command not found.")
             self.show_toast("Error: timedatectl command not found. Cannot get/set time settings.")
             self.timezone_row.set_sensitive(False)
             self.ntp_row.set_sensitive(False)
             self.complete_button.set_sensitive(False)
-        except subprocess.CalledProcessError as e:
-            print(f"ERROR: timedatectl status failed: {e}\n{e.stderr}")
-            self.show_toast(f"Error getting time settings: {e.stderr}")
+            return False
+        if isinstance(error, subprocess.CalledProcessError):
+            print(f"ERROR: timedatectl status failed: {error}\n{error.stderr}")
+            self.show_toast(f"Error getting time settings: {error.stderr}")
             # Might still be able to set, keep UI enabled for now?
-        except subprocess.TimeoutExpired:
+            return False
+        if isinstance(error, subprocess.TimeoutExpired):
             print("ERROR: timedatectl status command timed out.")
             self.show_toast("Getting time settings timed out.")
-        except Exception as e:
-            print(f"ERROR: Unexpected error fetching time settings: {e}")
+            return False
+        if error is not None:
+            print(f"ERROR: Unexpected error fetching time settings: {error}")
             self.show_toast(f"An unexpected error occurred fetching time settings.")
+            return False
+
+        print(f"timedatectl status output:\n{output}")
+
+        # Parse Timezone
+        tz_match = re.search(r"Time zone: ([^ ]+)", output)
+        if tz_match:
+            self.current_timezone = tz_match.group(1)
+            print(f"  Found Timezone: {self.current_timezone}")
+        else:
+            print("  Could not parse timezone from timedatectl output.")
+            # Keep default self.current_timezone = "UTC"
+
+        # Parse NTP status
+        ntp_match = re.search(r"NTP service: (\w+)", output)
+        if ntp_match:
+            self.current_ntp = (ntp_match.group(1) == "active")
+            print(f"  Found NTP status: {self.current_ntp}")
+        else:
+             # Older versions might use "Network time on: yes/no"
+             ntp_match_alt = re.search(r"Network time on: (yes|no)", output)
+             if ntp_match_alt:
+                  self.current_ntp = (ntp_match_alt.group(1) == "yes")
+                  print(f"  Found Network time status: {self.current_ntp}")
+             else:
+                  print("  Could not parse NTP status from timedatectl output.")
+                  # Keep default self.current_ntp = False
+
+        # Update UI based on fetched values
+        # Set Timezone Combo
+        self._select_current_timezone()
+            
+        # Set NTP Switch
+        self.ntp_row.set_active(self.current_ntp)
+        
+        # Ensure widgets are sensitive
+        self.timezone_row.set_sensitive(bool(self.timezone_list))
+        self.ntp_row.set_sensitive(True)
+        self.complete_button.set_sensitive(bool(self.timezone_list))
+        return False
             
     def apply_settings_and_return(self, button):
         """Applies timezone and NTP settings using timedatectl."""
@@ -1,10 +1,7 @@
 # centrio_installer/ui/user.py
 
-import gi
 import subprocess # For useradd, chpasswd
 import shlex      # For safe command construction
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw
 
 from .base import BaseConfigurationPage
@@ -1,13 +1,16 @@
 # centrio_installer/ui/welcome.py
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Adw', '1')
+import os
+import re
+import subprocess
 from gi.repository import Gtk, Adw
 
 # Import the utility function
 from utils import get_os_release_info
 
+# "System Locale: LANG=..." line in `localectl status` output
+_SYSTEM_LOCALE_RE = re.compile(r"System Locale: LANG=(\S+)")
+
 # Simple translation dictionary for installer interface
 TRANSLATIONS = {
     'en_US': {
@@ -268,9 +271,6 @@ class WelcomePage(Gtk.Box):
     def _detect_current_language(self):
         """Detect the current system language."""
         try:
-            import subprocess
-            import os
-            
             # First try to get from environment
             lang = os.environ.get('LANG', '')
             if lang:
@@ -284,8 +284,7 @@ class WelcomePage(Gtk.Box):
             output = result.stdout
             
             # Parse System Locale
-            import re
-            locale_match = re.search(r"System Locale: LANG=(\S+)", output)
+            locale_match = _SYSTEM_LOCALE_RE.search(output)
             if locale_match:
                 lang = locale_match.group(1)
                 lang_code = lang.split('.')[0]
@@ -35,6 +35,7 @@ class CentrioInstallerWindow(Adw.ApplicationWindow):
         # All known configuration page keys
         self.config_page_keys = ["keyboard", "language", "timedate", "disk", "network", "user", "payload", "bootloader"]
         self.final_config = {} # Stores final selected values passed back from ui
+        self._navigation_update_pending = False # One idle navigation refresh at a time
 
         self.set_title("Centrio Installer")
         self.set_default_size(700, 350)  # Much smaller default height
@@ -245,10 +246,14 @@ class CentrioInstallerWindow(Adw.ApplicationWindow):
     def update_navigation(self, stack=None, param=None):
         """Update the state of back/next buttons based on the current page."""
         # Use idle_add to prevent issues if called during stack transitions
-        GLib.idle_add(self._update_navigation_idle)
+        # A page switch plus config completion fire several requests back to back; one refresh covers them all
+        if not self._navigation_update_pending:
+            self._navigation_update_pending = True
+            GLib.idle_add(self._update_navigation_idle, priority=GLib.PRIORITY_DEFAULT_IDLE)
 
     def _update_navigation_idle(self):
         """Actual navigation update logic, called via GLib.idle_add."""
+        self._navigation_update_pending = False
         current_page_name, is_main_page, is_config_page, main_index = self.get_current_page_info()
 
         if not current_page_name:
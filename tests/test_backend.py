@@ -0,0 +1,106 @@
+# tests/test_backend.py
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import backend
+
+
+def test_stream_command_success():
+    result = backend._stream_command(["true"])
+    assert result.returncode == 0
+    assert result.stdout == ""
+
+
+def test_stream_command_check_raises():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        backend._stream_command(["false"], check=True)
+    assert excinfo.value.returncode == 1
+
+
+def test_stream_command_line_callback():
+    lines = []
+    result = backend._stream_command(["printf", "a\\nb\\n"], line_callback=lines.append)
+    assert result.returncode == 0
+    assert lines == ["a", "b"]
+    assert result.stdout == "a\nb\n"
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="_run_command goes through pkexec when not root")
+def test_run_command_timeout_keeps_partial_stdout():
+    success, err, stdout = backend._run_command(["/bin/sh", "-c", "echo started; sleep 5"], "sleep", timeout=0.5)
+    assert not success
+    assert "Timeout" in err
+    assert stdout == "started"
+
+
+class _FakeCancellable:
+    """Just enough of Gio.Cancellable for _root_runner_call."""
+
+    def __init__(self):
+        self._handler = None
+        self._cancelled = False
+
+    def connect(self, _signal, handler):
+        self._handler = handler
+        return 1
+
+    def disconnect(self, _handler_id):
+        self._handler = None
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+        if self._handler:
+            self._handler(self)
+
+
+@pytest.fixture
+def root_runner():
+    # The runner source without pkexec in front of it
+    runner = subprocess.Popen([sys.executable, "-c", backend._ROOT_RUNNER_SRC],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert runner.stdout.readline()
+    backend._root_runner = runner
+    yield runner
+    backend.stop_root_runner()
+
+
+def test_root_runner_call(root_runner):
+    response = backend._root_runner_call(["cat"], None, "input")
+    assert response == {"rc": 0, "stdout": "input", "stderr": ""}
+
+
+def test_root_runner_call_cancel(root_runner):
+    cancellable = _FakeCancellable()
+    timer = threading.Timer(0.2, cancellable.cancel)
+    timer.start()
+    started = time.monotonic()
+    # The shell forks sleep: the cancel has to reach the whole process group, not just /bin/sh
+    response = backend._root_runner_call(["/bin/sh", "-c", "sleep 30; echo done"], 60, None, cancellable)
+    timer.join()
+    assert response["rc"] != 0
+    assert time.monotonic() - started < 10
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="_run_command goes through pkexec when not root")
+def test_run_command_cancel_stops_child_processes():
+    cancellable = _FakeCancellable()
+    timer = threading.Timer(0.2, cancellable.cancel)
+    timer.start()
+    started = time.monotonic()
+    success, _err, stdout = backend._run_command(["/bin/sh", "-c", "echo started; sleep 30; echo done"], "sleep",
+                                                 cancellable=cancellable)
+    timer.join()
+    assert not success
+    assert stdout == "started"
+    assert time.monotonic() - started < 10